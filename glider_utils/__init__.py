@@ -1,5 +1,5 @@
-import sys as _sys
-from distutils.version import LooseVersion as __LV
+import importlib as _importlib
+import importlib.util as _importlib_util
 
 import numpy as np
 
@@ -7,20 +7,81 @@ import numpy as np
 from .geo import *
 from .analysis import *
 #import geo
-from .parsers.dvl_parser import DVLparser
-from .parsers.dbd_parsers import DbaDataParser
-from .parsers.gliderstate_parser import GSxml
 #from .parsers.dbd_parsers import DataVizDataParser
 
-# seawater 3 uses the GSW package that only works for version 3.5 and higher
-_ver = "%d.%d" % (_sys.version_info.major, _sys.version_info.minor)
-if __LV(_ver) >= __LV("3.5"):
-    from . import seawater3 as sw
-else:
+# The parsers and the seawater module (which needs gsw) are only imported the
+# first time they are accessed, so `import glider_utils` stays cheap.
+_LAZY = {
+    'DVLparser': ('.parsers.dvl_parser', 'DVLparser'),
+    'DbaDataParser': ('.parsers.dbd_parsers', 'DbaDataParser'),
+    'GSxml': ('.parsers.gliderstate_parser', 'GSxml'),
+    'sw': ('.seawater3', None),
+}
+
+
+def __getattr__(name):
     try:
-        from . import seawater2 as sw
-    except ImportError:
-        pass
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        ) from None
+    module = _importlib.import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+# numba is only imported when `fwd_fill` compiles its first kernel, so it
+# doesn't add to the time of `import glider_utils`
+_HAVE_NUMBA = _importlib_util.find_spec('numba') is not None
+
+# compiled forward fill kernels, one per float dtype
+_FF_KERNELS = {}
+
+
+def _fwd_fill_loop(y, init):
+    """single pass forward fill of `y` in place.  Leading nans are filled
+    with `init`, or back filled with the first finite value if `init` is
+    nan.  Compiled with numba for each dtype by `_fwd_fill_kernel`."""
+    n = y.shape[0]
+    first = 0
+    while first < n and y[first] != y[first]:
+        first += 1
+    if first > 0:
+        if init == init:
+            fill = init
+        elif first < n:
+            fill = y[first]
+        else:
+            return
+        for i in range(first):
+            y[i] = fill
+    if first == n:
+        return
+    last = y[first]
+    for i in range(first + 1, n):
+        v = y[i]
+        if v == v:
+            last = v
+        else:
+            y[i] = last
+
+
+def _fwd_fill_kernel(dtype):
+    """the compiled forward fill for `dtype`, compiling it on first use"""
+    kernel = _FF_KERNELS.get(dtype)
+    if kernel is None:
+        from numba import njit, from_dtype
+        nb_type = from_dtype(dtype)
+        kernel = njit((nb_type[:], nb_type), cache=True)(_fwd_fill_loop)
+        _FF_KERNELS[dtype] = kernel
+    return kernel
+
 
 def fwd_fill(x, init_nan_fill=None):
     """ Forward fills an array with nans, i.e. fill each nan or nan cluster with
@@ -31,81 +92,71 @@ def fwd_fill(x, init_nan_fill=None):
         defaults to back filling with the first finite value.
     :return: array x with nans forward filled
     """
+    if not _HAVE_NUMBA:
+        return _fwd_fill_np(x, init_nan_fill)
 
-    # This function assumes that the first value in the array is finite.
-    # That should be accounted for.  This can be accounted for by identifying
-    # nan category number 0. if there is a zero, it means it is at the start
-    # of the array.
     y = x.copy()
+    # integer, bool, etc. arrays cannot hold nans, so there is nothing to fill
+    if not np.issubdtype(y.dtype, np.inexact):
+        return y
+    init = np.nan if init_nan_fill is None else init_nan_fill
+    _fwd_fill_kernel(y.dtype)(y, y.dtype.type(init))
+    return y
 
-    # first get indexes of nans
-    nan_index = np.where(np.isnan(y))[0]  # assuming 1d, so take [0] index
-
-    # create an ordinal set vector the same length as nan_index
-    # i.e. (0,1,2,3,4,...)
-    nanrange = range(len(nan_index))
-
-    # subtraction basically makes a numerical category for each consecutive
-    # index value
-
-    # subtraction creates a "category" vector where each unique value
-    # represents a specific sequence of nans in y, and, the number of
-    # occurrences of a particular value gives the number of NaNs in that
-    # particular sequence.
-
-    # E.g.
-    # x = [19.8, nan, nan, nan, 11.3, 9.3, nan, nan, nan, 7.4, nan, nan, 4.5])
-    # nan_index = [1, 2, 3, 6, 7, 8, 10, 11]
-    # nanrange =  [0, 1, 2, 3, 4, 5,  6,  7]; subtract nanrange from nan_index
-    # nan_cats =  [1, 1, 1, 3, 3, 3,  4,  4];
-    # categorical numbers represent a group of consecutive nans
-    nan_cats = nan_index - nanrange
-
-    # using np.unique creates the unique category groups, and also returns an
-    # index where the first occurrence of the category group number occurs (
-    # firstidx), and an array of indexes that can reproduce nan_cats from
-    # uniques (restoreidx)
-    uniques, firstidx, restoreidx = np.unique(nan_cats, True, True)
-
-    # using firstidx on nan_index instead, gives the indexes of the first nan
-    # in each cluster.  Subtracting those indexs by 1 gives the indexes for
-    # the finite value preceeding each nan cluster.  Then simply use the
-    # restoring index to repeat the preceeding finite values into an index
-    # array (good_index) that is the same shape as nan_index.
-    good_index = (nan_index[firstidx] - 1)[restoreidx]
-
-    # So using x[good_index] makes an array of the preceeding good values with
-    # the same repititions as the nan clusters.  Then you can reinsert that
-    # repeating finite value array into where the nans were in the original
-    # array using ...
-
-    if not init_nan_fill:
-        init_nan_fill = y[np.isfinite(y)][0]
-    if 0 in uniques:
-        y = np.append(y, init_nan_fill)
-
-    y[nan_index] = y[good_index]
-
-    if 0 in uniques:
-        y = np.delete(y, -1)
+
+def _fwd_fill_np(x, init_nan_fill=None):
+    """numpy forward fill used when numba is not available"""
+    # Give every value the index of the latest non-nan value at or before it
+    # by taking a running maximum of the non-nan indexes (nans get 0), then
+    # index x with it.  E.g.
+    # x =    [nan, 19.8, nan, nan, 11.3, 9.3, nan]
+    # idx =  [  0,    1,   0,   0,    4,   5,   0]
+    # accumulated max:
+    # idx =  [  0,    1,   1,   1,    4,   5,   5]
+    # x[idx] = [nan, 19.8, 19.8, 19.8, 11.3, 9.3, 9.3]
+    mask = ~np.isnan(x)
+    idx = np.where(mask, np.arange(x.size), 0)
+    np.maximum.accumulate(idx, out=idx)
+    y = x[idx]
+
+    # any initial nans have no preceeding value and are still nan
+    if x.size and not mask[0]:
+        n_init = mask.argmax() if mask.any() else x.size
+        if init_nan_fill is None:
+            if n_init == x.size:
+                return y
+            init_nan_fill = x[n_init]
+        y[:n_init] = init_nan_fill
 
     return y
 
 
 def fwd_fill_to_new_x(oldx, newx, y):
-    """forward fill y values to new x/timestamp values"""
-    temp_x = list(oldx)
-    temp_x.extend(list(newx))
-    all_x, unique_ii, inverse_ii = np.unique(temp_x, return_index=True, return_inverse=True)
-    
-    temp_y = np.full_like(temp_x, np.nan)
-    temp_y[0:len(oldx)] = y
-    all_y = temp_y[unique_ii]
-    all_y_ff = fwd_fill(all_y)
-    
-    temp_y_ff = all_y_ff[inverse_ii]
-    y_at_new_x = temp_y_ff[len(oldx):]
-    return y_at_new_x
+    """forward fill y values to new x/timestamp values.  Where old x values
+    repeat, only the y of the first of them is used."""
+    oldx = np.asarray(oldx)
+    newx = np.asarray(newx)
+    # y is filled with nans, so it is always float regardless of the x dtype
+    y = np.asarray(y, dtype=np.float64)
+    # only sort when oldx is not already in order
+    if np.any(oldx[1:] < oldx[:-1]):
+        order = np.argsort(oldx, kind='stable')
+        oldx = oldx[order]
+        y = y[order]
+    # of repeated old x values only the first is used, like the original
+    # np.unique version, so the sort above has to be stable
+    repeats = oldx[1:] == oldx[:-1]
+    if repeats.any():
+        first = np.concatenate(([True], ~repeats))
+        oldx = oldx[first]
+        y = y[first]
+    y_ff = fwd_fill(y)
+
+    # index of the last old x at or before each new x
+    k = np.searchsorted(oldx, newx, side='right') - 1
+    # new x values before the first old x are back filled
+    np.clip(k, 0, None, out=k)
+    return y_ff[k]
 
 
 def cluster_index(indices, ids=False):
@@ -118,20 +169,9 @@ def cluster_index(indices, ids=False):
 
 
 def nan_array_equal(arr1, arr2):
-    finites1 = np.isfinite(arr1)
-    finites2 = np.isfinite(arr2)
-    aa = np.array_equal(finites1, finites2)
-
-    nans1 = np.isnan(arr1)
-    nans2 = np.isnan(arr2)
-    bb = np.array_equal(nans1, nans2)
-
-    cc = np.array_equal(arr1[finites1], arr2[finites2])
-
-    if aa and bb and cc:
-        return True
-    else:
-        return False
+    """True if two arrays have the same shape and values, with nans in the
+    same places counted as equal"""
+    return np.array_equal(arr1, arr2, equal_nan=True)
 
 
 def all_sci_indices(gldata):
@@ -140,12 +180,17 @@ def all_sci_indices(gldata):
     :param gldata: A GliderData instance
     :return:
     """
-    sci_indices = np.array([], dtype=np.int64)
+    # OR together a mask of finite values for each science sensor rather than
+    # taking the sorted union of index arrays sensor by sensor.
+    sci_mask = None
     for sci_sensor in DATA_CONFIG_LIST:
         sci_data = gldata.getdata(sci_sensor)
-        sci_ii = np.flatnonzero(np.isfinite(sci_data))
-        sci_indices = np.union1d(sci_indices, sci_ii)
-    return sci_indices
+        if sci_mask is None:
+            sci_mask = np.zeros(len(sci_data), dtype=bool)
+        np.logical_or(sci_mask, np.isfinite(sci_data), out=sci_mask)
+    if sci_mask is None:
+        return np.array([], dtype=np.int64)
+    return np.flatnonzero(sci_mask)
 
 # This came from Kerfoot's gncutils package.  I don't think its worth much
 # without having indices that tell you which columns have been removed, but
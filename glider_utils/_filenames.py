@@ -0,0 +1,20 @@
+"""
+@package glider_utils
+@file _filenames.py
+@brief Slocum glider filename and header time formats
+
+Shared by `general` and `parsers.dbd_parsers`.  general imports from
+dbd_parsers, so dbd_parsers takes the formats from here rather than from
+general.
+"""
+import re
+
+# `fileopen_time` header format with the underscores replaced by spaces
+FILEOPEN_TIME_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+# a long Slocum data filename, e.g. ce_386-2023-100-2-3.dbd, with groups for
+# the year and day, mission number and segment number
+slocumregex = (
+    r'[a-z_0-9]+(?:_|-)(\d{4}(?:_|-)\d{3}(?:_|-))(\d{1,2})(?:_|-)'
+    r'(\d{1,4})\..+')
+regex = re.compile(slocumregex)
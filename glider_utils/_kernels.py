@@ -0,0 +1,52 @@
+"""
+@package glider_utils
+@file _kernels.py
+@brief Numba kernels compiled on first use
+
+numba takes a few hundred ms to import, so modules with numba kernels don't
+import it themselves.  They mark their module level kernel functions with
+`kernel` and call `compile_kernels(globals())` before the first use, which
+swaps each marked function for its compiled version.  A kernel that loops
+with the module's `_prange` gets numba's parallel range once compiled (and
+plain `range` if it is ever run uncompiled).
+"""
+import threading
+from importlib.util import find_spec
+
+HAVE_NUMBA = find_spec('numba') is not None
+
+# one module's kernels are compiled at a time, so threads making their first
+# calls together neither compile twice nor see a half swapped namespace
+_COMPILE_LOCK = threading.Lock()
+
+# the (name, njit options) of the marked kernels of each module, by module
+_MARKED = {}
+
+
+def kernel(**options):
+    """mark a module level function as a numba kernel, to be compiled with
+    `njit(cache=True, **options)` by `compile_kernels`"""
+    def mark(func):
+        _MARKED.setdefault(func.__module__, []).append(
+            (func.__name__, options))
+        return func
+    return mark
+
+
+def compile_kernels(namespace):
+    """replace the marked kernels in a module's `namespace` (its globals())
+    with their compiled versions, the first time only.  numba compiles a
+    kernel at its first call, looking up any kernel it calls in the
+    namespace, so it finds that kernel's compiled version."""
+    if namespace.get('_KERNELS_COMPILED'):
+        return
+    with _COMPILE_LOCK:
+        if namespace.get('_KERNELS_COMPILED'):
+            return
+        import numba
+        namespace['_prange'] = numba.prange
+        for name, options in _MARKED.get(namespace['__name__'], ()):
+            namespace[name] = numba.njit(cache=True, **options)(
+                namespace[name])
+        # set last, so a thread that skips the lock sees every kernel swapped
+        namespace['_KERNELS_COMPILED'] = True
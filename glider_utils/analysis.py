@@ -28,34 +28,37 @@ def amphrs_used_per_day(pdts, amphrs):
         The amp hours per day rate for each day from the input data.
     
     """
-    # get the bounds
-    start = pdts[0]
-    end = pdts[-1]
-    # need each day without time for finding the day's data indexes
-    # so create a daterange (no times)
-    daterange = pd.date_range(start.date(), end.date())
-    
+    # group the row numbers by calendar day and take each day's first and
+    # last row, so a nan amphrs keeps its row's timestamp (first() and
+    # last() would skip it column by column).  pdts is time ordered so the
+    # groups come out in order without sorting.
+    day_key = pdts.floor('D')
+    amphrs = np.asarray(amphrs)
+    rows = pd.Series(np.arange(len(pdts)), index=pdts)
+    g = rows.groupby(day_key, sort=False)
+    counts = g.size()
+
+    # exclude any missing days of data (days with fewer than 2 points)
+    daterange = pd.date_range(day_key[0], day_key[-1])
+    for dayte in daterange.difference(counts.index[counts >= 2]):
+        print("skipping ", dayte)
+
+    first = g.min()[counts >= 2]
+    last = g.max()[counts >= 2]
+
     # find the amphrs used each day as an amphrs_per_day value
-    ahrspd = []
-    ahrspd_ts = []  # timestamp to return with ahrspd
-    for dayte in daterange:
-        day_ii = np.flatnonzero(pdts.date == dayte.date())  # the day's indices
-        # exclude any missing days of data
-        if len(day_ii) < 2:
-            print("skipping ", dayte)
-            continue
-        ahrs_used = amphrs[day_ii][-1] - amphrs[day_ii][0]
-        day_fraction = (pdts[day_ii][-1] - pdts[day_ii][0]).total_seconds() / 86400
-        ahrs_per_day = ahrs_used / day_fraction
-        ahrspd.append(ahrs_per_day)
-        # for plotting amphrs per day create a timestamp for each value at
-        # the day's center
-        ahrspd_ts.append(dayte + td(hours=12))
-    
+    ahrs_used = amphrs[last.to_numpy()] - amphrs[first.to_numpy()]
+    day_fraction = (pdts[last.to_numpy()] -
+                    pdts[first.to_numpy()]).total_seconds() / 86400
+    ahrspd = ahrs_used / np.asarray(day_fraction)
+
+    # for plotting amphrs per day create a timestamp for each value at
+    # the day's center
+    ahrspd_ts = first.index + td(hours=12)
+
     # If the last timestamp of data is less than the day center (12:00 UTC)
     # then make the last timestamp the same as the end of the data record
     if ahrspd_ts[-1] > pdts[-1]:
-        ahrspd_ts[-1] = pdts[-1]
+        ahrspd_ts = ahrspd_ts[:-1].append(pd.DatetimeIndex([pdts[-1]]))
 
-    return ahrspd_ts, np.array(ahrspd)
-    
\ No newline at end of file
+    return ahrspd_ts, ahrspd
@@ -1,4 +1,7 @@
 from datetime import datetime as dt
+
+import numpy as np
+
 from glider_utils.geo import iso2deg
 
 def carry_around_add(a, b):
@@ -8,14 +11,34 @@ def carry_around_add(a, b):
     c = a + b
     return (c & 0xff) + (c >> 16)
 
+# the value of each hex digit by its character code, -1 for anything else
+_HEX_VALUES = np.full(256, -1, dtype=np.int64)
+for _digit in '0123456789abcdefABCDEF':
+    _HEX_VALUES[ord(_digit)] = int(_digit, 16)
+
+
 def checksum(msg):
     """
     calculate the checksum. documents say sum all the previous bytes and take
     the ones complement. that doesn't work, need to use the carry around.
+
+    Each hex digit (4 bits) of the message is carry around added.  A digit
+    added to the running sum never reaches 2**16, so `carry_around_add`
+    only keeps the low byte and the sum is the digit total mod 256; long
+    messages take that total with numpy instead of the loop.
     """
-    s = 0
-    for i in msg:
-        s = carry_around_add(s,int(i,16))
+    if len(msg) < 64:
+        # short messages: numpy call overhead outweighs the loop itself
+        s = 0
+        for i in msg:
+            s = carry_around_add(s,int(i,16))
+    else:
+        codes = np.frombuffer(msg.encode('ascii'), dtype=np.uint8)
+        digits = _HEX_VALUES[codes]
+        if (digits < 0).any():
+            raise ValueError(
+                "invalid hex digit in message: {!r}".format(msg))
+        s = int(digits.sum()) & 0xff
     return ~s + 1 & 0xff
 
 
@@ -27,9 +50,11 @@ def checksum2(msg):
         return ~s + 1 & 0xff
 
 def twos_comp(hexstr, nbits):
+    # sign extend without a branch: flipping the sign bit and subtracting it
+    # maps [0, 2**nbits) onto [-2**(nbits-1), 2**(nbits-1))
     b = int(hexstr, 16)
-    if b >= 1<<nbits-1: b -= 1<<nbits
-    return b
+    m = 1 << (nbits-1)
+    return (b ^ m) - m
 
 
 def decode(msg):
@@ -59,38 +84,46 @@ def print_decode(msg):
      """.format(**msg_dict))
 
 
+# (field, byte offset, number of bytes, signed) of each message field
+_DEV_FIELDS = (
+    ('time', 0, 4, False),
+    ('val_lat', 4, 3, True),
+    ('val_lon', 7, 3, True),
+    ('val_fix', 10, 2, False),
+    ('inv_lat', 12, 3, True),
+    ('inv_lon', 15, 3, True),
+    ('inv_fix', 18, 2, False),
+    ('tf_lat', 20, 3, True),
+    ('tf_lon', 23, 3, True),
+    ('tf_fix', 26, 2, False),
+    ('vx', 28, 1, True),
+    ('vy', 29, 1, True),
+)
+_DEV_NBYTES = 30
+
+
 def dev_decode(msg):
-    time_hex = msg[0:8]
-    lat_hex = msg[8:14]
-    lon_hex = msg[14:20]
-    fixtime_hex = msg[20:24]
-    invlat_hex = msg[24:30]
-    invlon_hex = msg[30:36]
-    invfixtime_hex = msg[36:40]
-    tflat_hex = msg[40:46]
-    tflon_hex = msg[46:52]
-    tffixtime_hex = msg[52:56]
-    vx_hex = msg[56:58]
-    vy_hex = msg[58:60]
-    timestamp = dt.utcfromtimestamp(int(time_hex, 16))
-    val_lat = twos_comp(lat_hex, 4*6)
-    val_lon = twos_comp(lon_hex, 4*6)
-    val_fix = int(fixtime_hex, 16)
-    inv_lat = twos_comp(invlat_hex, 4*6)
-    inv_lon = twos_comp(invlon_hex, 4*6)
-    inv_fix = int(invfixtime_hex, 16)
-    tf_lat = twos_comp(tflat_hex, 4*6)
-    tf_lon = twos_comp(tflon_hex, 4*6)
-    tf_fix = int(tffixtime_hex, 16)
-    vx = twos_comp(vx_hex, 2*4)
-    vy = twos_comp(vy_hex, 2*4)
-    
-    print("{:s}".format(timestamp.isoformat()))
+    """print the fields of a hex development message, and return them as a
+    dict of integers (the time as a datetime)"""
+    # convert the hex string to bytes once and pull each field out of the
+    # buffer; int.from_bytes does the two's complement for signed fields.
+    if len(msg) < 2*_DEV_NBYTES:
+        raise ValueError(
+            "message is {:d} hex digits, {:d} are needed: {!r}".format(
+                len(msg), 2*_DEV_NBYTES, msg))
+    buf = bytes.fromhex(msg[:2*_DEV_NBYTES])
+    fields = {
+        name: int.from_bytes(buf[start:start+nbytes], 'big', signed=signed)
+        for name, start, nbytes, signed in _DEV_FIELDS}
+    fields['time'] = dt.utcfromtimestamp(fields['time'])
+
+    print("{:s}".format(fields['time'].isoformat()))
     #print("lat: {:.4f} ({:.4f}), lon: {:.4f} ({:.4f})".format(
-    print("Valid lat: {:d}, lon: {:d}, {:d} min ago".format(
-        val_lat, val_lon, val_fix))
-    print("Invalid lat: {:d}, lon: {:d}, {:d} min ago".format(
-        inv_lat, inv_lon, inv_fix))
-    print("Too Far lat: {:d}, lon: {:d}, {:d} min ago".format(
-        tf_lat, tf_lon, tf_fix))
-    print("Water velocity: vx {:f}, vy {:f}".format(vx, vy))
\ No newline at end of file
+    print("Valid lat: {val_lat:d}, lon: {val_lon:d}, {val_fix:d} min ago".format(
+        **fields))
+    print("Invalid lat: {inv_lat:d}, lon: {inv_lon:d}, {inv_fix:d} min ago".format(
+        **fields))
+    print("Too Far lat: {tf_lat:d}, lon: {tf_lon:d}, {tf_fix:d} min ago".format(
+        **fields))
+    print("Water velocity: vx {vx:f}, vy {vy:f}".format(**fields))
+    return fields
@@ -1,20 +1,55 @@
+import os
 import re
 import logging
+from functools import lru_cache
 from datetime import datetime as dt
-from dateutil.parser import parser as dtparse
+from datetime import timezone
+from dateutil.parser import parse as dtparse
 import numpy as np
 import pandas as pd
 from glider_utils.parsers.dbd_parsers import get_fileopen_time
+from glider_utils._filenames import (
+    FILEOPEN_TIME_FORMAT, slocumregex, regex)
 
 
+# a UTC offset ending an ISO 8601 time, e.g. '+00:00', '-0500' or '+01',
+# with the time after a 'T' or a space.  numpy warns about (and will stop)
+# parsing those, so they go to dateutil
+_TZ_OFFSET_RE = re.compile(r'[T ][\d:.]+[+-]\d{2}(?::?\d{2})?$')
+
+
+def _datetime64(timestr, unit):
+    """parse a UTC time string to a numpy datetime64 with `unit` precision.
+    ISO 8601 strings without an offset use numpy's parser, anything else
+    falls back to dateutil and is converted to UTC"""
+    if not _TZ_OFFSET_RE.search(timestr):
+        try:
+            return np.datetime64(timestr.rstrip('Z'), unit)
+        except ValueError:
+            pass
+    ts = dtparse(timestr)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(ts, unit)
+
 def mts(timestr):
     """returns a unix timestamp in seconds since Jan 1, 1970"""
-    ts = dtparse(timestr)
-    return (ts - datetime(1970,1,1)).total_seconds()
+    return _datetime64(timestr, 'ns').astype('int64') / 1e9
+
+def mts_batch(timestrs):
+    """returns unix timestamps in seconds since Jan 1, 1970 for a sequence of
+    ISO 8601 time strings"""
+    timestrs = [ts.rstrip('Z') for ts in timestrs]
+    if any(_TZ_OFFSET_RE.search(ts) for ts in timestrs):
+        arr = np.array([_datetime64(ts, 'ns') for ts in timestrs],
+                       dtype='datetime64[ns]')
+    else:
+        arr = np.array(timestrs, dtype='datetime64[ns]')
+    return arr.astype('int64') / 1e9
     
 def ooimts(timestr):
     """returns a unix timestamp in milliseconds since Jan 1 1970"""
-    return int(mts(timestr) * 1000)
+    return int(_datetime64(timestr, 'ms').astype('int64'))
 
 def gdpath(glider, deployment):
     """returns the path to a specific glider deployment data directory"""
@@ -35,27 +70,30 @@ def gliderfile_from_time(ts, files):
     elif isinstance(ts, (int, float)):
         ts = dt.utcfromtimestamp(ts)
     #elif isinstance(ts, dt):
-    opentimes = np.empty(len(files), dtype='datetime64[ns]')
-    for ii, file in enumerate(files):
-        opentime = get_fileopen_time(file)
-        ot_dt = dt.strptime(opentime.replace("_", " "), "%c")
-        opentimes[ii] = ot_dt
+    # reading each header is unavoidable, but parse all of the open times in
+    # one call.  e.g. 'Tue_Mar__5_12:34:56_2024' -> 'Tue Mar  5 12:34:56 2024'
+    raw = [get_fileopen_time(file).replace("_", " ")
+           for file in files]
+    opentimes = pd.to_datetime(
+        raw, format=FILEOPEN_TIME_FORMAT, cache=True).values
     # get the sorting indices
     sortii = np.argsort(opentimes)
     sorted_ots = opentimes[sortii]
     sorted_files = np.array(files)[sortii]
     
     ts = np.datetime64(ts)
-    file_index = np.flatnonzero(sorted_ots < ts)[-1]
+    file_index = np.searchsorted(sorted_ots, ts, side='right') - 1
+    if file_index < 0:
+        raise ValueError("{} is before the first file's open time".format(ts))
     return sorted_files[file_index]
 
-slocumregex = (
-    r'[a-z_0-9]+(?:_|-)(\d{4}(?:_|-)\d{3}(?:_|-))(\d{1,2})(?:_|-)'
-    r'(\d{1,4})\..+')
-regex = re.compile(slocumregex)
-
-
+@lru_cache(maxsize=4096)
 def sort_function(filename):
+    """sort key for Slocum glider data filenames.
+
+    Returns a (year_day, mission number, segment number) tuple so files sort
+    by date, then mission, then segment.  Keys are cached per filename.
+    """
     fname = os.path.basename(filename)
     match = regex.search(fname)
     if not match:
@@ -65,8 +103,4 @@ def sort_function(filename):
             ))
         logging.warning(error_msg)
         raise ValueError(error_msg)
-    else:
-        mission_num = '{:02d}'.format(int(match.group(2)))
-        segment_num = '{:04d}'.format(int(match.group(3)))
-        sort_str = match.group(1) + mission_num + '_' + segment_num
-    return sort_str
\ No newline at end of file
+    return match.group(1), int(match.group(2)), int(match.group(3))
@@ -11,11 +11,57 @@ __license__ = 'Apache 2.0'
 
 import warnings
 import re
+import math
+import numbers
+from functools import lru_cache
+
+from importlib.util import find_spec
 
 import numpy as np
 
+from ._kernels import HAVE_NUMBA as _HAVE_NUMBA, kernel as _kernel
+from ._kernels import compile_kernels as _compile_kernels
+
+# numba and numexpr are only imported when an array path first uses them,
+# so importing geo and the scalar math paths never load them
+_HAVE_NUMEXPR = find_spec('numexpr') is not None
+_prange = range  # numba's parallel range once the kernels are compiled
+
+R_EARTH = 6371.  # mean radius of the earth (km)
+# degree/radian conversion factors; multiplying by these is the same
+# as np.deg2rad/np.rad2deg and quicker on arrays
+_DEG2RAD = math.pi / 180.
+_RAD2DEG = 180. / math.pi
+_HALF_DEG2RAD = math.pi / 360.  # degrees to radians and halved
+
+
+def _scalars(*values):
+    """True if all values are Python/numpy real scalars or 0-d arrays, which
+    are faster through `math` than through numpy ufuncs and come back as
+    scalars from it"""
+    return all(isinstance(value, numbers.Real) or
+               (isinstance(value, np.ndarray) and value.ndim == 0)
+               for value in values)
+
+
+def _round(values, decimals):
+    """round a freshly calculated result, in place if it is an array"""
+    if isinstance(values, np.ndarray):
+        return np.round(values, decimals, out=values)
+    return round(values, decimals)
+
 
 def isostr2deg(latlon_str, printIt=0):
+    lat, lon = _isostr2deg(latlon_str)
+
+    if printIt:
+        print('lat: %.4f, lon: %.4f' % (lat,lon))
+    else:
+        return lat, lon
+
+@lru_cache(maxsize=4096)
+def _isostr2deg(latlon_str):
+    """cached parse for `isostr2deg`; logs repeat the same fixes often"""
     latlons = latlon_str.split()
     lat_ = latlons[0]
     lon_ = latlons[2]
@@ -27,11 +73,23 @@ def isostr2deg(latlon_str, printIt=0):
     lon_deg = float(lon_[0:4])
     lon_min = float(lon_[4:])
     lon = lon_deg - lon_min/60.
+    return lat, lon
 
-    if printIt:
-        print('lat: %.4f, lon: %.4f' % (lat,lon))
-    else:
-        return lat, lon
+def isostr2deg_array(latlon_strs):
+    """array version of `isostr2deg` for a sequence of position strings.
+
+    The strings are only split in Python, the degree and minute substrings
+    are converted to floats and combined as whole arrays.
+    Returns lat, lon arrays in decimal degrees.
+    """
+    latlons = [latlon_str.split() for latlon_str in latlon_strs]
+    lat_deg = np.array([ll[0][0:2] for ll in latlons], dtype=np.float64)
+    lat_min = np.array([ll[0][2:] for ll in latlons], dtype=np.float64)
+    lon_deg = np.array([ll[2][0:4] for ll in latlons], dtype=np.float64)
+    lon_min = np.array([ll[2][4:] for ll in latlons], dtype=np.float64)
+    lat = lat_deg + lat_min/60.
+    lon = lon_deg - lon_min/60.
+    return lat, lon
 
 def iso2deg(iso_pos_element):
     """iso2deg converts a glider iso position element to 
@@ -41,8 +99,28 @@ def iso2deg(iso_pos_element):
     > iso2deg(lat)
     44.574
     """
-    minutes, degrees = np.modf(iso_pos_element / 100.)
-    degrees = degrees + (minutes*100./60.)
+    if _HAVE_NUMBA and np.ndim(iso_pos_element) > 0:
+        _compile_kernels(globals())
+        iso_pos_element = np.asarray(iso_pos_element, dtype=np.float64)
+        return _iso2deg_nb(iso_pos_element.ravel()).reshape(
+            iso_pos_element.shape)
+    # same arithmetic as degrees + (minutes*100./60.), done in place so
+    # arrays only allocate the modf outputs
+    minutes, degrees = np.modf(np.divide(iso_pos_element, 100.))
+    minutes *= 100.
+    minutes /= 60.
+    degrees += minutes
+    return degrees
+
+@_kernel(parallel=True)
+def _iso2deg_nb(iso_pos):
+    """iso2deg in one pass over a flat float array"""
+    n = iso_pos.shape[0]
+    degrees = np.empty(n)
+    for i in _prange(n):
+        deg_d100 = iso_pos[i] / 100.
+        deg = math.trunc(deg_d100)
+        degrees[i] = deg + ((deg_d100 - deg)*100.)/60.
     return degrees
 
 def deg2iso(lat, lon):
@@ -53,8 +131,8 @@ def deg2iso(lat, lon):
     lon_frac, lon_deg = np.modf(lon)
     lat_min = lat_frac * 60.
     lon_min = lon_frac * 60.
-    lat_iso = np.round(lat_deg * 100 + lat_min, 3)
-    lon_iso = np.round(lon_deg * 100 + lon_min, 3)
+    lat_iso = _round(lat_deg * 100 + lat_min, 3)
+    lon_iso = _round(lon_deg * 100 + lon_min, 3)
     return lat_iso, lon_iso
 
 def deg2iso_element(pos_element):
@@ -63,23 +141,37 @@ def deg2iso_element(pos_element):
     """
     frac, deg = np.modf(pos_element)
     minutes = frac * 60.
-    pos_iso = np.round(deg * 100 + minutes, 3)
+    pos_iso = _round(deg * 100 + minutes, 3)
     return pos_iso
 
 def _deg2iso(lat, lon, printIt=0):
-    """older version of deg2iso
+    """older version of deg2iso, returns ISO format strings.  Array inputs
+    return arrays of strings.
     """
-    lat_frac, lat_deg = np.modf(lat)
-    lon_frac, lon_deg = np.modf(lon)
-    lat_min = lat_frac * 60.
-    lon_min = lon_frac * 60.
-    iso_lat_str = "%d%06.3f" % (lat_deg, abs(lat_min))
-    iso_lon_str = "%d%06.3f" % (lon_deg, abs(lon_min))
+    if np.ndim(lat) == 0 and np.ndim(lon) == 0:
+        iso_lat_str = _iso_str(lat)
+        iso_lon_str = _iso_str(lon)
+    else:
+        iso_lat_str = _iso_str_array(lat)
+        iso_lon_str = _iso_str_array(lon)
     if printIt:
         print('lat: %s, lon: %s' % (iso_lat_str, iso_lon_str))
     else:
         return iso_lat_str, iso_lon_str
 
+def _iso_str(pos_element):
+    """format a decimal degree scalar as a compact ISO string"""
+    deg = int(pos_element)
+    return "%d%06.3f" % (deg, abs((pos_element - deg) * 60.))
+
+def _iso_str_array(pos_element):
+    """format a decimal degree array as an array of compact ISO strings"""
+    pos_element = np.asarray(pos_element, dtype=np.float64)
+    deg = np.trunc(pos_element)
+    minutes = np.abs(pos_element - deg)
+    minutes *= 60.
+    return np.char.add(np.char.mod('%d', deg), np.char.mod('%06.3f', minutes))
+
 def deg2iso_pprint(lat, lon):
     """Prints ISO format (degrees, decimal minutes) in a nice format.
     e.g. DD° MM.MMM' N, DDD° MM.MMM' W
@@ -106,7 +198,9 @@ def deg2iso_pprint(lat, lon):
     return pos_str
 
 def deg2dms(lat,lon, printIt=0):
-    """ convert decimal degrees to degrees, minutes, seconds format
+    """ convert decimal degrees to degrees, minutes, seconds format.
+    Returns (lat_deg, lat_min, lat_sec), (lon_deg, lon_min, lon_sec), or
+    prints them if `printIt`.
     """
     lat_frac, lat_deg = np.modf(lat)
     lon_frac, lon_deg = np.modf(lon)
@@ -117,11 +211,20 @@ def deg2dms(lat,lon, printIt=0):
     lat_sec = lat_sfrac * 60
     lon_sec = lon_sfrac * 60
     if printIt:
-        print("lat: %s %s' %s\", lon: %s %s' %s\"" % (lat_deg, lat_min, lat_sec, lon_min, lon_sec))
+        print("lat: %s %s' %s\", lon: %s %s' %s\"" % (
+            lat_deg, lat_min, lat_sec, lon_deg, lon_min, lon_sec))
+    else:
+        return (lat_deg, lat_min, lat_sec), (lon_deg, lon_min, lon_sec)
 
 def speed2vector(speed, dir, deg=True):
+    """x and y vector components of a speed and direction.  `dir` is the
+    angle counterclockwise from the x axis in degrees, or radians if `deg`
+    is False (the inverse of `vector2speed`)"""
+    if _scalars(speed, dir):
+        rad_dir = math.radians(dir) if deg else dir
+        return speed * math.cos(rad_dir), speed * math.sin(rad_dir)
     if deg:
-        rad_dir = np.rad2deg(dir)
+        rad_dir = np.deg2rad(dir)
     else:
         rad_dir = dir
     vx = speed * np.cos(rad_dir)
@@ -129,28 +232,54 @@ def speed2vector(speed, dir, deg=True):
     return vx, vy
 
 def vector2speed(vx, vy, deg=True):
-    speed = np.sqrt(vx**2 + vy**2)
+    """speed and direction of x and y vector components.  The direction is
+    the angle counterclockwise from the x axis in degrees, or radians if
+    `deg` is False (the inverse of `speed2vector`)"""
+    if _scalars(vx, vy):
+        speed = math.hypot(vx, vy)
+        dir = math.atan2(vy, vx)
+        if deg:
+            dir = math.degrees(dir)
+        return speed, dir
+    # hypot is one pass and doesn't overflow/underflow squaring
+    speed = np.hypot(vx, vy)
     dir = np.arctan2(vy, vx)
     if deg:
         dir = np.rad2deg(dir)
     return speed, dir
 
-def azimuth(pt1, pt2):
-    lat1 = np.rad2deg(pt1[0])
-    lon1 = np.rad2deg(pt1[1])
-    lat2 = np.rad2deg(pt2[0])
-    lon2 = np.rad2deg(pt2[1])
-    f = 1/298.257223563  # squish for WGS84 ellipsoid
-    e2 = f * (2-f)
-    lam = (1-e2) * (np.tan(lat2)/np.tan(lat1)) + \
-        e2 * np.sqrt(
-            (1+(1-e2) * np.tan(lat2)**2) / 
-            (1+(1-e2) * np.tan(lat1)**2))
-    azi = np.arctan(
-        np.sin(lon2-lon1) /
-        (lam - np.cos(lon2-lon1)) * np.sin(lat1))
-    return azi
+def azimuth(lat1, lon1, lat2=None, lon2=None):
+    """Forward azimuth from one position to another
+
+    Params
+    ------
+    lat1,lon1 : float or array (decimal degrees)
+        The start position.
+    lat2,lon2 : float or array (decimal degrees)
+        The end position, broadcast against the start position.
+        The older `azimuth(pt1, pt2)` form, with (lat, lon) pairs as the
+        first 2 arguments, is still accepted.
+
+    returns
+    -------
+    azi : float or array (degrees)
+        The initial great circle azimuth from position 1 to 2 clockwise
+        from true North, 0 to 360.  The same as `bearing`.
+    """
+    if lat2 is None and lon2 is None:
+        (lat1, lon1), (lat2, lon2) = lat1, lon1
+    if not _scalars(lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = (
+            np.asarray(pos, dtype=np.float64)
+            for pos in (lat1, lon1, lat2, lon2))
+    return bearing(lat1, lon1, lat2, lon2)
 #
+# the haversine formula from degrees for numexpr, with k = π/360:
+# a = sin²(Δφ/2) + cos φ1 ⋅ cos φ2 ⋅ sin²(Δλ/2), then d = 2R ⋅ asin(√a)
+_HAVERSINE_A_NE = ("sin((lat2-lat1)*k)**2 + "
+                   "cos(lat1*2*k)*cos(lat2*2*k)*sin((lon2-lon1)*k)**2")
+_HAVERSINE_D_NE = "2*R*arcsin(sqrt(where(a > 1, 1, a)))"
+
 def haversine_dist(lat1, lon1, lat2, lon2):
     """Calculate the great circle distance between 2 lat & lon positions
     
@@ -158,50 +287,277 @@ def haversine_dist(lat1, lon1, lat2, lon2):
     km between 2 positions.
     Params
     ------
-    lat1,lon1 : float (decimal degrees)
+    lat1,lon1 : float or array (decimal degrees)
         The latitude and longitude of the first position as decimal
         degrees.
-    lat2,lon2 : float
+    lat2,lon2 : float or array
         The latitude and longitude of the second position as decimal
-        degrees.
+        degrees.  Positions 1 and 2 are broadcast against each other.
     
     returns
     -------
-    dist : float (km)
+    dist : float or array (km)
         The great circle distance between positions 1 and 2 in km.
         
     from http://www.movable-type.co.uk/scripts/latlong.html
     """
-    R = 6371 # km
-    phi1 = np.deg2rad(lat1)
-    phi2 = np.deg2rad(lat2)
-    # lon1 = np.deg2rad(lon1)
-    # lon2 = np.deg2rad(lon2)
-    del_phi = np.deg2rad(lat2-lat1)
-    del_lam = np.deg2rad(lon2-lon1)
-
-    a = (
-        np.sin(del_phi/2.)**2. +
-        np.cos(phi1) * np.cos(phi2) *
-        np.sin(del_lam/2.)**2.
-    )
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-    d = R * c
+    if _scalars(lat1, lon1, lat2, lon2):
+        return _haversine_dist_scalar(lat1, lon1, lat2, lon2)
+    if _HAVE_NUMBA:
+        _compile_kernels(globals())
+        return _broadcast_kernel(_haversine_dist_nb, lat1, lon1, lat2, lon2)
+    if _HAVE_NUMEXPR:
+        import numexpr as _ne
+        # numexpr evaluates the whole formula in cache sized blocks without
+        # the full size temporaries of the numpy version below
+        a = _ne.evaluate(_HAVERSINE_A_NE, local_dict={
+            'lat1': lat1, 'lon1': lon1, 'lat2': lat2, 'lon2': lon2,
+            'k': _HALF_DEG2RAD})
+        return _ne.evaluate(_HAVERSINE_D_NE, local_dict={
+            'a': a, 'R': R_EARTH})
+
+    R = R_EARTH # km
+    # broadcast the positions together (a single point against an array of
+    # points works).  Only the latitudes need converting to radians; the
+    # half differences are converted in the same multiply that halves them.
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(pos, dtype=np.float64)
+          for pos in (lat1, lon1, lat2, lon2)))
+
+    # a = sin²(Δφ/2) + cos φ1 ⋅ cos φ2 ⋅ sin²(Δλ/2), built up in place in
+    # 3 buffers rather than a new array per operation
+    a = np.subtract(lat2, lat1)
+    a *= _HALF_DEG2RAD
+    np.sin(a, out=a)
+    a *= a
+    b = np.subtract(lon2, lon1)
+    b *= _HALF_DEG2RAD
+    np.sin(b, out=b)
+    b *= b
+    cos_phi = np.multiply(lat1, _DEG2RAD)
+    np.cos(cos_phi, out=cos_phi)
+    b *= cos_phi
+    np.multiply(lat2, _DEG2RAD, out=cos_phi)
+    np.cos(cos_phi, out=cos_phi)
+    b *= cos_phi
+    a += b
+    # 2⋅asin(√a) is the same angle as 2⋅atan2(√a, √(1−a)) with one fewer
+    # sqrt and transcendental; clip rounding error so a stays <= 1
+    np.minimum(a, 1., out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * R
+    return a
+
+def haversine_dist_fast(lat1, lon1, lat2, lon2):
+    """Great circle distance (km) by the spherical law of cosines
+
+    d = R ⋅ acos(sin φ1 ⋅ sin φ2 + cos φ1 ⋅ cos φ2 ⋅ cos Δλ)
+
+    One acos and no sqrt or atan2, so cheaper than `haversine_dist`, but
+    the acos argument is close to 1 for short distances and loses
+    precision there.  Good to a few metres beyond ~1 km; use
+    `haversine_dist_auto` when short distances are mixed in.
+    Takes the same arguments as `haversine_dist`.
+    """
+    if _scalars(lat1, lon1, lat2, lon2):
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        cos_c = (math.sin(phi1)*math.sin(phi2) +
+                 math.cos(phi1)*math.cos(phi2)*math.cos(math.radians(lon2-lon1)))
+        return R_EARTH * math.acos(max(-1., min(cos_c, 1.)))
+
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(pos, dtype=np.float64)
+          for pos in (lat1, lon1, lat2, lon2)))
+    phi1 = lat1 * _DEG2RAD
+    phi2 = lat2 * _DEG2RAD
+    cos_c = np.cos((lon2-lon1) * _DEG2RAD)
+    cos_c *= np.cos(phi1)
+    cos_c *= np.cos(phi2)
+    cos_c += np.sin(phi1) * np.sin(phi2)
+    np.clip(cos_c, -1., 1., out=cos_c)
+    return R_EARTH * np.arccos(cos_c)
+
+# lat/lon difference (degrees) below which the cosine law is too imprecise
+# and `haversine_dist_auto` uses the haversine formula, ~1 km of latitude
+_SHORT_DIST_DEG = 0.01
+
+def haversine_dist_auto(lat1, lon1, lat2, lon2):
+    """Great circle distance (km), picking the formula by distance
+
+    Positions whose latitude and longitude differences are both under
+    ~0.01 degrees use `haversine_dist`, all others the cheaper
+    `haversine_dist_fast`.  Takes the same arguments as `haversine_dist`.
+    """
+    if _scalars(lat1, lon1, lat2, lon2):
+        if (abs(lat2-lat1) < _SHORT_DIST_DEG and
+                abs(lon2-lon1) < _SHORT_DIST_DEG):
+            return haversine_dist(lat1, lon1, lat2, lon2)
+        return haversine_dist_fast(lat1, lon1, lat2, lon2)
+
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(pos, dtype=np.float64)
+          for pos in (lat1, lon1, lat2, lon2)))
+    d = haversine_dist_fast(lat1, lon1, lat2, lon2)
+    short = ((np.abs(lat2-lat1) < _SHORT_DIST_DEG) &
+             (np.abs(lon2-lon1) < _SHORT_DIST_DEG))
+    if short.any():
+        d[short] = haversine_dist(
+            lat1[short], lon1[short], lat2[short], lon2[short])
     return d
 
+def haversine_pairwise(lat1, lon1, lat2, lon2, dtype=np.float64):
+    """All-pairs great circle distances (km) between 2 sets of positions
+
+    Params
+    ------
+    lat1,lon1 : 1-D arrays (decimal degrees), length N
+    lat2,lon2 : 1-D arrays (decimal degrees), length M
+    dtype : numpy float type, dtype or dtype name, optional
+        The precision of the calculation and result.  np.float32 halves the
+        memory of the (N, M) result and is good to ~1 m at glider scales.
+
+    returns
+    -------
+    dist : (N, M) array (km)
+        dist[i, j] is the haversine distance from position i of the first
+        set to position j of the second.
+    """
+    # a scalar of the dtype, whether it is given as a type, dtype or name
+    scalar = np.dtype(dtype).type
+    lat1 = np.asarray(lat1, dtype=dtype).ravel()
+    lon1 = np.asarray(lon1, dtype=dtype).ravel()
+    lat2 = np.asarray(lat2, dtype=dtype).ravel()
+    lon2 = np.asarray(lon2, dtype=dtype).ravel()
+    half = scalar(_HALF_DEG2RAD)
+
+    # the per-position cosines are only length N and M, the rest is built
+    # up in place on the (N, M) grid
+    cos_phi1 = np.cos(lat1 * _DEG2RAD)[:, None]
+    cos_phi2 = np.cos(lat2 * _DEG2RAD)[None, :]
+    a = lat2[None, :] - lat1[:, None]
+    a *= half
+    np.sin(a, out=a)
+    a *= a
+    b = lon2[None, :] - lon1[:, None]
+    b *= half
+    np.sin(b, out=b)
+    b *= b
+    b *= cos_phi1
+    b *= cos_phi2
+    a += b
+    np.minimum(a, 1, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= scalar(2 * R_EARTH)
+    return a
+
 def bearing(lat1, lon1, lat2, lon2):
     """ Calculate bearing azimuth from two points
     on a sphere.
-    
+
     from http://www.movable-type.co.uk/scripts/latlong.html
     """
-    del_lam = np.deg2rad(lon2-lon1)
+    if _scalars(lat1, lon1, lat2, lon2):
+        return _bearing_scalar(lat1, lon1, lat2, lon2)
+    if _HAVE_NUMBA:
+        _compile_kernels(globals())
+        return _broadcast_kernel(_bearing_nb, lat1, lon1, lat2, lon2)
+
+    del_lam = (lon2-lon1) * _DEG2RAD
     phi1 = np.deg2rad(lat1)
     phi2 = np.deg2rad(lat2)
-    y = np.sin(del_lam) * np.cos(phi2)
-    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1)*np.cos(phi2)*np.cos(del_lam)
-    brng = np.rad2deg(np.arctan2(y, x))
-    return brng % 360
+    cos_phi2 = np.cos(phi2)
+    y = np.sin(del_lam) * cos_phi2
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1)*cos_phi2*np.cos(del_lam)
+    brng = np.arctan2(y, x)
+    if np.ndim(brng) == 0:
+        return np.rad2deg(brng) % 360
+    # convert and wrap the atan2 output in place, no further temporaries
+    brng *= _RAD2DEG
+    np.mod(brng, 360., out=brng)
+    return brng
+
+
+def _haversine_dist_scalar(lat1, lon1, lat2, lon2):
+    """haversine distance (km) between 2 scalar positions"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    sin_dphi = math.sin(math.radians(lat2-lat1) * 0.5)
+    sin_dlam = math.sin(math.radians(lon2-lon1) * 0.5)
+    a = (sin_dphi*sin_dphi +
+         math.cos(phi1)*math.cos(phi2)*sin_dlam*sin_dlam)
+    return 2 * R_EARTH * math.asin(math.sqrt(min(a, 1.)))
+
+
+def _bearing_scalar(lat1, lon1, lat2, lon2):
+    """initial bearing (degrees) between 2 scalar positions"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    del_lam = math.radians(lon2-lon1)
+    cos_phi2 = math.cos(phi2)
+    y = math.sin(del_lam) * cos_phi2
+    x = (math.cos(phi1)*math.sin(phi2) -
+         math.sin(phi1)*cos_phi2*math.cos(del_lam))
+    return math.degrees(math.atan2(y, x)) % 360
+
+
+def _broadcast_kernel(kernel, lat1, lon1, lat2, lon2):
+    """broadcast 2 sets of positions together and run a compiled kernel over
+    them as flat float arrays, returning the result in the broadcast shape"""
+    arrs = np.broadcast_arrays(lat1, lon1, lat2, lon2)
+    shape = arrs[0].shape
+    flat = [np.ascontiguousarray(arr, dtype=np.float64).ravel()
+            for arr in arrs]
+    return kernel(*flat).reshape(shape)
+
+
+@_kernel(parallel=True)
+def _haversine_dist_nb(lat1, lon1, lat2, lon2):
+    """haversine distance (km) in one pass over flat float arrays"""
+    n = lat1.shape[0]
+    d = np.empty(n)
+    for i in _prange(n):
+        phi1 = math.radians(lat1[i])
+        phi2 = math.radians(lat2[i])
+        sin_dphi = math.sin(math.radians(lat2[i] - lat1[i]) * 0.5)
+        sin_dlam = math.sin(math.radians(lon2[i] - lon1[i]) * 0.5)
+        a = (sin_dphi*sin_dphi +
+             math.cos(phi1)*math.cos(phi2)*sin_dlam*sin_dlam)
+        d[i] = 2 * R_EARTH * math.asin(math.sqrt(min(a, 1.)))
+    return d
+
+
+@_kernel(parallel=True)
+def _bearing_nb(lat1, lon1, lat2, lon2):
+    """initial bearing (degrees) in one pass over flat float arrays"""
+    n = lat1.shape[0]
+    brng = np.empty(n)
+    for i in _prange(n):
+        phi1 = math.radians(lat1[i])
+        phi2 = math.radians(lat2[i])
+        del_lam = math.radians(lon2[i] - lon1[i])
+        cos_phi2 = math.cos(phi2)
+        y = math.sin(del_lam) * cos_phi2
+        x = (math.cos(phi1)*math.sin(phi2) -
+             math.sin(phi1)*cos_phi2*math.cos(del_lam))
+        brng[i] = math.degrees(math.atan2(y, x)) % 360
+    return brng
+
+
+# compass direction text for each `direction_text` division, ordered
+# clockwise from North
+_DIRS = {
+    4: ("N", "E", "S", "W"),
+    8: ("N", "NE", "E", "SE", "S", "SW", "W", "NW"),
+    16: (
+        'N', 'NNE', 'NE', 'ENE',
+        'E', 'ESE', 'SE', 'SSE',
+        'S', 'SSW', 'SW', 'WSW',
+        'W', 'WNW', 'NW', 'NNW'),
+}
+_DIRS_ARRAYS = {div: np.array(dirs) for div, dirs in _DIRS.items()}
 
 
 def direction_text(bearing, div=8):
@@ -213,8 +569,8 @@ def direction_text(bearing, div=8):
     
     Params
     ------
-    bearing : float
-        The bearing value to translate into a direction text
+    bearing : float or array
+        The bearing value(s) to translate into a direction text
     div : Division, optional int value of 4, 8, or 16
         The number of divisions of compass directions to use. Allowed
         divisions are 4, 8, or 16.  8 is the default and is used for any
@@ -226,36 +582,29 @@ def direction_text(bearing, div=8):
     
     Returns
     -------
-    direction : str
+    direction : str or array of str
         The text direction for the bearing input
     
     Borrowed from https://stackoverflow.com/questions/3209899/
     determine-compass-direction-from-one-lat-lon-to-the-other"""
 
-    dirs4 = ["E", "S", "W", "N"]
-    dirs8 = ["NE", "E", "SE", "S", "SW", "W", "NW", "N"]
-    dirs16 = [
-        'NNE', 'NE', 'ENE', 'E',
-        'ESE', 'SE', 'SSE', 'S',
-        'SSW', 'SW', 'WSW', 'W',
-        'WNW', 'NW', 'NNW', 'N']
-    
-    if div == 4:
-        dirs = dirs4
-    elif div == 16:
-        dirs = dirs16
-    else:
-        dirs = dirs8
+    if div not in _DIRS:
+        div = 8
+    # the divisions are powers of 2, so rounding to the nearest division
+    # and masking with div-1 wraps any bearing (negative or > 360) into
+    # 0 to div-1 without a modulo
+    scale = div / 360.
+    mask = div - 1
 
-    div_range = (360/div)
-    mark = div_range/2
-    
-    index = (bearing - mark) % 360
-    index = int(index / div_range)
-    return dirs[index]
+    if _scalars(bearing):
+        return _DIRS[div][math.floor(bearing*scale + 0.5) & mask]
+
+    index = np.floor(np.asarray(bearing)*scale + 0.5).astype(np.int64)
+    index &= mask
+    return _DIRS_ARRAYS[div][index]
 
 
-def dest_from_dist_and_bearing(lat, lon, bearing, dist):
+def dest_from_dist_and_bearing(lat, lon, bearing, dist, rounded=True):
     """Destination point given distance and bearing from start point
     
     Given a start point, initial bearing, and distance, this will calculate 
@@ -267,14 +616,18 @@ def dest_from_dist_and_bearing(lat, lon, bearing, dist):
     lat,lon : float (decimal degrees)
         The latitude and longitude of the starting position in decimal
         degrees.
-    bearing : float (degrees)
+    bearing : float or array (degrees)
         Bearing to follow in degrees from true North
-    dist : float (km)
-        Distance in kilometers to transit
+    dist : float or array (km)
+        Distance in kilometers to transit.  Arrays of bearings and/or
+        distances from a single start point are broadcast together.
+    rounded : bool, optional
+        Round the destination to 6 decimal places (~0.1 m), the default.
+        False skips the extra pass over the results.
     
     returns
     -------
-    lat2, lon2 : float (decimal degrees)
+    lat2, lon2 : float or array (decimal degrees)
         The latitude and longitude of the final position in decimal
         degrees.
     
@@ -289,19 +642,47 @@ def dest_from_dist_and_bearing(lat, lon, bearing, dist):
     # and R the earth’s radius
     
     R = 6371  # Radius of earth (km)
-    sin = np.sin
-    cos = np.cos
-    asin = np.arcsin
-    atan2 = np.arctan2
+    # scalars go through `math`, which avoids the ufunc overhead per call
+    if _scalars(lat, lon, bearing, dist):
+        sin = math.sin
+        cos = math.cos
+        asin = math.asin
+        atan2 = math.atan2
+        radians = math.radians
+        degrees = math.degrees
+    else:
+        sin = np.sin
+        cos = np.cos
+        asin = np.arcsin
+        atan2 = np.arctan2
+        radians = np.radians
+        degrees = np.degrees
+        bearing = np.asarray(bearing)
+        dist = np.asarray(dist)
     ad = dist / R  # angular distance = distance (km) / Radius of earth (km)
-    phi1 = np.radians(lat)
-    lam1 = np.radians(lon)
-    theta = np.radians(bearing)
-    phi2 = asin(sin(phi1) * cos(ad) + cos(phi1) * sin(ad)*cos(theta))
+    theta = radians(bearing)
+    # a fixed start point with many bearings and/or distances only needs
+    # its sine and cosine once, taken as scalars
+    if _scalars(lat, lon):
+        phi1 = math.radians(lat)
+        lam1 = math.radians(lon)
+        sin_phi1, cos_phi1 = math.sin(phi1), math.cos(phi1)
+    else:
+        phi1 = radians(lat)
+        lam1 = radians(lon)
+        sin_phi1, cos_phi1 = sin(phi1), cos(phi1)
+    # take each sine and cosine once, and since sin(asin(z)) = z, sin φ2
+    # is the argument of the asin rather than another sin call
+    sin_ad, cos_ad = sin(ad), cos(ad)
+    sin_theta, cos_theta = sin(theta), cos(theta)
+    sin_phi2 = sin_phi1 * cos_ad + cos_phi1 * sin_ad * cos_theta
+    phi2 = asin(sin_phi2)
     lam2 = lam1 + atan2(
-        sin(theta) * sin(ad) * cos(phi1),
-        cos(ad) - sin(phi1) * sin(phi2))
-    lat2 = np.degrees(phi2)
-    lon2 = np.degrees(lam2)
-    # return lat and lon rounded to 6 decimal places
-    return np.round(lat2, 6), np.round(lon2, 6)
\ No newline at end of file
+        sin_theta * sin_ad * cos_phi1,
+        cos_ad - sin_phi1 * sin_phi2)
+    lat2 = degrees(phi2)
+    lon2 = degrees(lam2)
+    if not rounded:
+        return lat2, lon2
+    # return lat and lon rounded to 6 decimal places, in place for arrays
+    return _round(lat2, 6), _round(lon2, 6)
@@ -1,24 +1,78 @@
 """module to read info from the Deployments google spreadsheet"""
 # SP 2023-10-03
 
+import os
+import time
+import logging
+from functools import cached_property, lru_cache
+
 import pandas as pd
-import numpy as np
 
 DEPLOYMENT_SHEET_URL = (
     'https://docs.google.com/spreadsheets/d/'      
     '1GuSMH5a_IIP37Mcf1jJK0q181cSeMTIObfIF8Ah_xR8/gviz/'
     'tq?tqx=out:csv&sheet=Deployments')
+# local copy of the sheet, and how old (seconds) it can be before the sheet
+# is fetched again
+DEPLOYMENT_CACHE_FILE = os.path.join(
+    os.path.expanduser('~'), '.cache', 'glider_utils', 'deployments.csv.gz')
+DEPLOYMENT_CACHE_TTL = 3600
 
 class DeploymentsGSheet(object):
     """provide an instance of the Deployments google sheet as a pandas data
     frame.
+
+    The sheet is only fetched when `info` is first used, and is kept in a
+    local cache file that is reused while it is younger than `ttl` seconds
+    (or if the sheet can't be fetched).
     """
-    def __init__(self):
+    def __init__(self, cache_file=DEPLOYMENT_CACHE_FILE,
+                 ttl=DEPLOYMENT_CACHE_TTL):
         self.url =  DEPLOYMENT_SHEET_URL
-        # pandas reads csvs via urls, no need for separate HTML requests
-        self.info = pd.read_csv(self.url)
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    @cached_property
+    def info(self):
+        try:
+            fresh = (time.time() - os.path.getmtime(self.cache_file)
+                     < self.ttl)
+        except OSError:
+            fresh = False
+        if fresh:
+            return pd.read_csv(self.cache_file)
+
+        try:
+            # pandas reads csvs via urls, no need for separate HTML requests
+            info = pd.read_csv(self.url)
+        except OSError as e:
+            if not os.path.exists(self.cache_file):
+                raise
+            logging.warning(
+                'Could not fetch the Deployments sheet, using the cached '
+                'copy {:s}: {}'.format(self.cache_file, e))
+            return pd.read_csv(self.cache_file)
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            info.to_csv(self.cache_file, index=False)
+        except OSError as e:
+            logging.warning('Could not cache the Deployments sheet: {}'.format(
+                e))
+        return info
+
+    @cached_property
+    def row_index(self):
+        """positional `info` row indices for each (Glider, Deployment Number)
+        key, so a deployment is a dict lookup rather than a scan"""
+        return self.info.groupby(
+            ['Glider', 'Deployment Number'], sort=False).indices
 
-_deployments = DeploymentsGSheet()
+@lru_cache(maxsize=1)
+def _deployments():
+    """the session's DeploymentsGSheet, created on first use rather than on
+    import"""
+    return DeploymentsGSheet()
 
 def deployment_row(glider, deployment_num):
     """ Get the glider deployment row 
@@ -58,9 +112,8 @@ def deployment_row(glider, deployment_num):
         raise DeploymentNumberError("bad `deployment_num` type")
     
     # retrieve index for specific glider deployment
-    deployii = np.flatnonzero(np.logical_and(
-        _deployments.info['Glider'] == glider_name, 
-        _deployments.info['Deployment Number'] == deploy_num))
+    deployments = _deployments()
+    deployii = deployments.row_index.get((glider_name, deploy_num), [])
     if len(deployii) == 0:
         print("No deployments found")
         return None
@@ -68,7 +121,7 @@ def deployment_row(glider, deployment_num):
         print("Too many deployments found, refine inputs and try again")
         return None
 
-    deployment_info = _deployments.info.iloc[deployii]
+    deployment_info = deployments.info.iloc[deployii]
     return deployment_info
 
 def deployment_dates_pdts(glider, deployment_num):
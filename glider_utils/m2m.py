@@ -1,6 +1,8 @@
 import netrc
 import time
 import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
@@ -14,6 +16,10 @@ SENSORS = {
     "adcpa": '03-ADCPAM000',
     "dosta": '04-DOSTAM000',
     "ctdgv": '05-CTDGVM000'}
+# deployment url path for each sensor, to be filled with the glider node
+SENSOR_PATHS = {
+    sensor: "/CE05MOAS/{node:s}/" + instr + "/"
+    for sensor, instr in SENSORS.items()}
     
 par_aliases = ["par", "parad", "par", "bsipar"]
 flo_aliases = ["eco", "ecopuck", "flo", "flor", "chlorophyll", "chlor", "cdom", "backscatter", "bb", "fl", "cd", "flbbcd"]
@@ -26,6 +32,19 @@ PROD_DOMAIN = "ooinet.oceanobservatories.org"
 DEV1_DOMAIN = "ooinet-dev1-west.intra.oceanobservatories.org"
 DEV2_DOMAIN = "ooinet-dev2-west.intra.oceanobservatories.org"
 
+@lru_cache(maxsize=128)
+def _glider_node(gliderid):
+    """the OOI node name of a glider serial number"""
+    if gliderid > 600:
+        return "G{:04d}".format(gliderid)
+    else:
+        return "GL{:d}".format(gliderid)
+
+@lru_cache(maxsize=1)
+def _netrc():
+    """the user's parsed .netrc file, read once for all sessions"""
+    return netrc.netrc()
+
 class m2mSession(object):
     """A class to manage urls, credentials, and a requests session for
     the OOI M2M API systems"""
@@ -73,10 +92,10 @@ class m2mSession(object):
 
         # if the netrc call is given a bad account/machine name, it
         # just returns `None`
-        credentials = netrc.netrc().authenticators(netrc_account)
+        credentials = _netrc().authenticators(netrc_account)
         if not credentials:
             # first try the default
-            credentials = netrc.netrc().authenticators(PROD_DOMAIN)
+            credentials = _netrc().authenticators(PROD_DOMAIN)
             # then fail with exit if credentials not found.
             if not credentials:
                 # Rather than annoying traceback message for a known
@@ -118,25 +137,22 @@ class m2mSession(object):
         Returns
         -------
         dictionary of json deployment info specifically for the sensor
+
+        Raises
+        ------
+        M2MConnectError
+            if the connection to the M2M server times out
         """
-        if gliderid > 600:
-            node = "G{:04d}".format(gliderid)
-        else:
-            node = "GL{:d}".format(gliderid)
-        
-        if not sensor or sensor not in SENSORS:
-            instr = SENSORS["eng"]
-        else:
-            instr = SENSORS[sensor]
-        
-        url = self.base_url + "/CE05MOAS/{:s}/{:s}/{:s}".format(
-            node, instr, str(deployment))
+        # unknown sensors default to the vehicle data
+        path = SENSOR_PATHS.get(sensor, SENSOR_PATHS["eng"])
+        url = (self.base_url + path.format(node=_glider_node(gliderid)) +
+               str(deployment))
             
         try:
             r = self.session.get(url, timeout=30)
         except requests.exceptions.ConnectTimeout as err:
-            logger.error("Could not connect to {:s}".format(self._base_dn))
-            sys.exit(2)
+            raise M2MConnectError(
+                "Could not connect to {:s}".format(self._base_dn)) from err
 
         if r.ok:
             return r.json()
@@ -193,4 +209,38 @@ class m2mSession(object):
             stop = None
 
         return start, stop
-# --- end m2mSession class ---
\ No newline at end of file
+
+    def get_deployment_dates_many(self, deployments, max_workers=8):
+        """
+        Start and end times for many deployments, requested concurrently
+        over the session's connection pool rather than one after another.
+
+        Parameters
+        ----------
+        deployments : iterable of tuples
+            (gliderid, deployment) or (gliderid, deployment, sensor) tuples,
+            the arguments of `get_deployment_dates`
+        max_workers : int
+            Maximum number of requests in flight at once, default 8.
+
+        Returns
+        -------
+        list of (start, stop) tuples in the order of `deployments`, as
+        returned by `get_deployment_dates`.  A deployment whose request
+        could not connect is logged and given (None, None) so the rest
+        still complete.
+        """
+        def dates(args):
+            try:
+                return self.get_deployment_dates(*args)
+            except M2MConnectError as err:
+                logger.error("{} for deployment {}".format(err, args))
+                return None, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(dates, deployments))
+# --- end m2mSession class ---
+
+class M2MConnectError(Exception):
+    """exception for when the M2M server can't be connected to"""
+    pass
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+@package glider_utils.parsers
+@file _pd0_kernels.py
+@brief Numba kernels for reading the ensembles of a PD0 file
+
+The compiled path of `dvl_parser.DVLparser`.  The kernels copy the bytes of
+each data type of each ensemble into a row of a byte table per data type,
+which `DVLparser` then reads with numpy a whole field at a time.  They are
+compiled on first use, with `compile_kernels(vars(_pd0_kernels))`.
+"""
+import numpy as np
+
+from .._kernels import kernel
+
+# the ExplorerDVL writes at most 7 data types (fixed and variable leaders,
+# velocity, correlation, echo intensity, percent good and bottom track),
+# any more are ignored
+MAX_DATA_TYPES = 7
+
+# problems `parse_ensembles` finds in an ensemble
+CUT_SHORT = 1
+CHECKSUM_MISMATCH = 2
+
+
+@kernel()
+def u16(data, i):
+    """little-endian unsigned short at byte i"""
+    return np.int64(data[i]) | (np.int64(data[i+1]) << 8)
+
+
+@kernel()
+def num_cells(data, starts):
+    """the number of depth cells in the fixed leader of each ensemble, 0 for
+    an ensemble without one"""
+    n = data.size
+    cells = np.zeros(starts.size, dtype=np.int64)
+    for k in range(starts.size):
+        s = starts[k]
+        for t in range(min(data[s+5], MAX_DATA_TYPES)):
+            if s + 8 + 2*t > n:
+                break
+            p = s + u16(data, s + 6 + 2*t)
+            if p + 10 <= n and u16(data, p) == 0:
+                cells[k] = data[p+9]
+                break
+    return cells
+
+
+@kernel()
+def parse_ensembles(data, starts, checksums, header, offsets, fixed,
+                    variable, bottom_track, has_fixed, has_variable, has_bt,
+                    velocity, correlation, echo, percent_good):
+    """Check the checksum of each ensemble starting at `starts` and copy
+    the bytes of its header and data types into a row of the per data
+    type byte tables, so numpy can read them a whole field at a time.
+    The `has_` flags mark the ensembles with a fixed leader, variable leader
+    and bottom track, the rows of the other ensembles are left zero.
+    Returns the index of the first bad ensemble and CUT_SHORT or
+    CHECKSUM_MISMATCH, or -1, 0 if all are good."""
+    n = data.size
+    for k in range(starts.size):
+        s = starts[k]
+        if s + 4 > n:
+            return k, CUT_SHORT
+        length = u16(data, s+2)
+        if length < 6 or s + length + 2 > n:
+            return k, CUT_SHORT
+        total = 0
+        for i in range(s, s + length):
+            total += data[i]
+        checksums[k] = total & 65535
+        if checksums[k] != u16(data, s + length):
+            return k, CHECKSUM_MISMATCH
+
+        header[k, :] = data[s:s+6]
+        end = s + length
+        cells = 0
+        for t in range(min(data[s+5], offsets.shape[1])):
+            if s + 8 + 2*t > end:
+                return k, CUT_SHORT
+            offsets[k, t] = u16(data, s + 6 + 2*t)
+            p = s + offsets[k, t]
+            if p + 2 > end:
+                return k, CUT_SHORT
+            data_type = u16(data, p)
+            if data_type == 0:
+                table = fixed[k]
+                has_fixed[k] = True
+            elif data_type == 128:
+                table = variable[k]
+                has_variable[k] = True
+            elif data_type == 256:
+                table = velocity[k, :2 + 8*cells]
+            elif data_type == 512:
+                table = correlation[k, :2 + 4*cells]
+            elif data_type == 768:
+                table = echo[k, :2 + 4*cells]
+            elif data_type == 1024:
+                table = percent_good[k, :2 + 4*cells]
+            elif data_type == 1536:
+                table = bottom_track[k]
+                has_bt[k] = True
+            else:
+                continue
+            if p + table.size > end:
+                return k, CUT_SHORT
+            table[:] = data[p:p + table.size]
+            if data_type == 0:
+                cells = np.int64(data[p+9])
+    return -1, 0
@@ -19,16 +19,16 @@ Release notes:
 """
 
 import re
-from struct import unpack
-from calendar import timegm
-import datetime as dt
-import sys
+from struct import Struct
 import logging
+import numpy as np
 
-log = logging.getLogger()
+# numba is only imported when the first file is parsed
+from .._kernels import HAVE_NUMBA as _HAVE_NUMBA
+from .._kernels import compile_kernels as _compile_kernels
+from . import _pd0_kernels as _pd0
 
-if sys.version_info.major < 3:
-    from exceptions import Exception
+log = logging.getLogger()
 
 
 
@@ -38,10 +38,126 @@ if sys.version_info.major < 3:
 # Regex set to find the start of PD0 packet (first 6 bytes of the header data).
 # This is more explicit than just the 0x7f7f marker the manual specifies. Using
 # this regex helps avoid cases where the marker could actually be in the data
-# string, thus giving a false positive data record marker.
-DVL_PD0_REGEX = re.compile(
-    b'(\x7f\x7f)([\x00-\xFF]{2})(\x00)(\x06|\x07)'
-    , re.DOTALL)
+# string, thus giving a false positive data record marker.  Only the match
+# starts are used, so the pattern has no groups to fill in.  (A bytes.find
+# loop on the 0x7f7f marker is ~2x slower, as the binary data hold many.)
+DVL_PD0_REGEX = re.compile(b'\x7f\x7f..\x00[\x06\x07]', re.DOTALL)
+
+# Precompiled layouts of the PD0 header and data types, all little-endian
+_U16 = Struct('<H')
+_HDR_STRUCT = Struct('<BBHBB')
+_FIXED_STRUCT = Struct('<HBBHBBBBHHHBBBBHBBBBhhBBHHBBBBHQHBBI')
+_VAR_STRUCT = Struct('<HHBBBBBBBBBBHHHhhHhBBBBBBBBBBBBBBBBBBHIII')
+_BT_STRUCT = Struct(
+    '<HHHBBBBHLHHHHhhhhBBBBBBBBBBBBHHHhhhhBBBBBBBBBBBBHBBBBBBBBB')
+
+# the field names of the layouts, for reading whole tables of them with numpy
+_HDR_FIELDS = (
+    'header_id', 'data_source_id', 'num_bytes', 'spare', 'num_data_types')
+_FIXED_FIELDS = (
+    'fixed_leader_id', 'firmware_version', 'firmware_revision',
+    'sysconfig_frequency', 'data_flag', 'lag_length', 'num_beams',
+    'num_cells', 'pings_per_ensemble', 'depth_cell_length',
+    'blank_after_transmit', 'signal_processing_mode', 'low_corr_threshold',
+    'num_code_repetitions', 'percent_good_min', 'error_vel_threshold',
+    'time_per_ping_minutes', 'time_per_ping_seconds',
+    'time_per_ping_hundredths', 'coord_transform_type', 'heading_alignment',
+    'heading_bias', 'sensor_source', 'sensor_available', 'bin_1_distance',
+    'transmit_pulse_length', 'reference_layer_start', 'reference_layer_stop',
+    'false_target_threshold', 'SPARE1', 'transmit_lag_distance', 'SPARE2',
+    'system_bandwidth', 'SPARE3', 'SPARE4', 'serial_number')
+_VAR_FIELDS = (
+    'variable_leader_id', 'ensemble_number', 'rtc_year', 'rtc_month',
+    'rtc_day', 'rtc_hour', 'rtc_minute', 'rtc_second', 'rtc_hundredths',
+    'ensemble_number_increment', 'error_bit_field',
+    'reserved_error_bit_field', 'speed_of_sound', 'transducer_depth',
+    'heading', 'pitch', 'roll', 'salinity', 'temperature', 'mpt_minutes',
+    'mpt_seconds_component', 'mpt_hundredths_component', 'heading_stdev',
+    'pitch_stdev', 'roll_stdev', 'adc_transmit_current',
+    'adc_transmit_voltage', 'adc_ambient_temp', 'adc_pressure_plus',
+    'adc_pressure_minus', 'adc_attitude_temp', 'adc_attitude',
+    'adc_contamination_sensor', 'error_status_word_1', 'error_status_word_2',
+    'error_status_word_3', 'error_status_word_4', 'SPARE1', 'pressure',
+    'pressure_variance', 'SPARE2')
+_BT_FIELDS = (
+    'bottom_track_id', 'bt_pings_per_ensemble', 'bt_delay_before_reacquire',
+    'bt_corr_magnitude_min', 'bt_eval_magnitude_min', 'bt_percent_good_min',
+    'bt_mode', 'bt_error_velocity_max', 'RESERVED', 'beam1_bt_range_lsb',
+    'beam2_bt_range_lsb', 'beam3_bt_range_lsb', 'beam4_bt_range_lsb',
+    'eastward_bt_velocity', 'northward_bt_velocity', 'upward_bt_velocity',
+    'error_bt_velocity', 'beam1_bt_correlation', 'beam2_bt_correlation',
+    'beam3_bt_correlation', 'beam4_bt_correlation', 'beam1_eval_amp',
+    'beam2_eval_amp', 'beam3_eval_amp', 'beam4_eval_amp',
+    'beam1_bt_percent_good', 'beam2_bt_percent_good', 'beam3_bt_percent_good',
+    'beam4_bt_percent_good', 'ref_layer_min', 'ref_layer_near',
+    'ref_layer_far', 'beam1_ref_layer_velocity', 'beam2_ref_layer_velocity',
+    'beam3_ref_layer_velocity', 'beam4_ref_layer_velocity',
+    'beam1_ref_correlation', 'beam2_ref_correlation', 'beam3_ref_correlation',
+    'beam4_ref_correlation', 'beam1_ref_intensity', 'beam2_ref_intensity',
+    'beam3_ref_intensity', 'beam4_ref_intensity', 'beam1_ref_percent_good',
+    'beam2_ref_percent_good', 'beam3_ref_percent_good',
+    'beam4_ref_percent_good', 'bt_max_depth', 'beam1_rssi_amplitude',
+    'beam2_rssi_amplitude', 'beam3_rssi_amplitude', 'beam4_rssi_amplitude',
+    'bt_gain', 'beam1_bt_range_msb', 'beam2_bt_range_msb',
+    'beam3_bt_range_msb', 'beam4_bt_range_msb')
+
+_NUMPY_CODES = {'B': 'u1', 'H': '<u2', 'h': '<i2', 'I': '<u4', 'L': '<u4',
+                'Q': '<u8'}
+
+def _struct_dtype(layout, names):
+    """numpy structured dtype of a little-endian struct layout"""
+    return np.dtype([(name, _NUMPY_CODES[code])
+                     for name, code in zip(names, layout.format[1:])])
+
+_HDR_DTYPE = _struct_dtype(_HDR_STRUCT, _HDR_FIELDS)
+_FIXED_DTYPE = _struct_dtype(_FIXED_STRUCT, _FIXED_FIELDS)
+_VAR_DTYPE = _struct_dtype(_VAR_STRUCT, _VAR_FIELDS)
+_BT_DTYPE = _struct_dtype(_BT_STRUCT, _BT_FIELDS)
+
+# days in the year before the start of each month, for a non leap year
+_CUM_DAYS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+def _epoch_seconds(year, month, day, hour, minute, second):
+    """seconds since 1970-01-01 of a UTC date and time, the same as
+    calendar.timegm but without building a datetime and time tuple"""
+    # leap days from 1970 up to the start of the year
+    leaps = (year - 1969)//4 - (year - 1901)//100 + (year - 1601)//400
+    days = (year - 1970)*365 + leaps + _CUM_DAYS[month - 1] + day - 1
+    if month > 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days += 1
+    return days*86400 + hour*3600 + minute*60 + second
+
+def _epoch_seconds_array(year, month, day, hour, minute, second):
+    """`_epoch_seconds` of int64 arrays of the date and time fields"""
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    leaps = (year - 1969)//4 - (year - 1901)//100 + (year - 1601)//400
+    days = ((year - 1970)*365 + leaps + np.take(_CUM_DAYS, month - 1) +
+            day - 1 + ((month > 2) & leap_year))
+    return days*86400 + hour*3600 + minute*60 + second
+
+def _num_cells(data, starts):
+    """the number of depth cells in the fixed leader of each ensemble, 0 for
+    an ensemble without one"""
+    n = len(data)
+    num_cells = np.zeros(len(starts), dtype=np.int64)
+    for k, start in enumerate(starts):
+        num_data_types = min(data[start+5], _pd0.MAX_DATA_TYPES)
+        for offset_pt in range(start + 6, start + 6 + 2*num_data_types, 2):
+            if offset_pt + 2 > n:
+                break
+            fixed_pt = start + _U16.unpack_from(data, offset_pt)[0]
+            if fixed_pt + 10 <= n and _U16.unpack_from(data, fixed_pt)[0] == 0:
+                num_cells[k] = data[fixed_pt+9]
+                break
+    return num_cells
+
+def _chunk(ensemble, offset, num_bytes, length):
+    """the `num_bytes` of the data type at `offset` of an ensemble, which
+    must end before its checksum at `length`"""
+    if offset + num_bytes > length:
+        raise SampleException("Ensemble is cut short")
+    return ensemble[offset:offset+num_bytes]
+
 class SampleException(Exception):
     CGLDR_ADCPA_PD0_PARSED = 'cgldr_adcpa_pd0_parsed'
 
@@ -254,16 +370,127 @@ class Names(object):
     # Ensemble checksum
     CHECKSUM = 'checksum'
 
+# the field names, in the order they are defined in Names
+_NAME_VALUES = tuple(value for key, value in vars(Names).items()
+                     if not key.startswith('_') and isinstance(value, str))
+
+# system frequencies (kHz) by the low 3 bits of the sysconfig register
+_FREQUENCIES = (75, 150, 300, 600, 1200, 2400)
+
+# (name, register, mask) of the single bit flags in the fixed leader
+_FIXED_BITS = (
+    (Names.SYSCONFIG_BEAM_PATTERN, 'sysconfig_frequency', 0b00001000),
+    (Names.SYSCONFIG_HEAD_ATTACHED, 'sysconfig_frequency', 0b01000000),
+    (Names.SYSCONFIG_VERTICAL_ORIENTATION, 'sysconfig_frequency', 0b10000000),
+    (Names.COORD_TRANSFORM_TILTS, 'coord_transform_type', 0b00000100),
+    (Names.COORD_TRANSFORM_BEAMS, 'coord_transform_type', 0b00000010),
+    (Names.COORD_TRANSFORM_MAPPING, 'coord_transform_type', 0b00000001),
+    (Names.SENSOR_SOURCE_SPEED, 'sensor_source', 0b01000000),
+    (Names.SENSOR_SOURCE_DEPTH, 'sensor_source', 0b00100000),
+    (Names.SENSOR_SOURCE_HEADING, 'sensor_source', 0b00010000),
+    (Names.SENSOR_SOURCE_PITCH, 'sensor_source', 0b00001000),
+    (Names.SENSOR_SOURCE_ROLL, 'sensor_source', 0b00000100),
+    (Names.SENSOR_SOURCE_CONDUCTIVITY, 'sensor_source', 0b00000010),
+    (Names.SENSOR_SOURCE_TEMPERATURE, 'sensor_source', 0b00000001),
+    (Names.SENSOR_AVAILABLE_DEPTH, 'sensor_available', 0b00100000),
+    (Names.SENSOR_AVAILABLE_HEADING, 'sensor_available', 0b00010000),
+    (Names.SENSOR_AVAILABLE_PITCH, 'sensor_available', 0b00001000),
+    (Names.SENSOR_AVAILABLE_ROLL, 'sensor_available', 0b00000100),
+    (Names.SENSOR_AVAILABLE_CONDUCTIVITY, 'sensor_available', 0b00000010),
+    (Names.SENSOR_AVAILABLE_TEMPERATURE, 'sensor_available', 0b00000001),
+)
+
+# (name, register, mask) of the single bit flags in the variable leader
+_VARIABLE_BITS = (
+    (Names.BIT_RESULT_DEMOD_1, 'error_bit_field', 0b00001000),
+    (Names.BIT_RESULT_DEMOD_2, 'error_bit_field', 0b00010000),
+    (Names.BIT_RESULT_TIMING, 'error_bit_field', 0b00000010),
+    (Names.BUS_ERROR_EXCEPTION, 'error_status_word_1', 0b00000001),
+    (Names.ADDRESS_ERROR_EXCEPTION, 'error_status_word_1', 0b00000010),
+    (Names.ILLEGAL_INSTRUCTION_EXCEPTION, 'error_status_word_1', 0b00000100),
+    (Names.ZERO_DIVIDE_INSTRUCTION, 'error_status_word_1', 0b00001000),
+    (Names.EMULATOR_EXCEPTION, 'error_status_word_1', 0b00010000),
+    (Names.UNASSIGNED_EXCEPTION, 'error_status_word_1', 0b00100000),
+    (Names.WATCHDOG_RESTART_OCCURRED, 'error_status_word_1', 0b01000000),
+    (Names.BATTERY_SAVER_POWER, 'error_status_word_1', 0b10000000),
+    (Names.PINGING, 'error_status_word_1', 0b00000001),
+    (Names.COLD_WAKEUP_OCCURRED, 'error_status_word_1', 0b01000000),
+    (Names.UNKNOWN_WAKEUP_OCCURRED, 'error_status_word_1', 0b10000000),
+    (Names.CLOCK_READ_ERROR, 'error_status_word_3', 0b00000001),
+    (Names.UNEXPECTED_ALARM, 'error_status_word_3', 0b00000010),
+    (Names.CLOCK_JUMP_FORWARD, 'error_status_word_3', 0b00000100),
+    (Names.CLOCK_JUMP_BACKWARD, 'error_status_word_3', 0b00001000),
+    (Names.POWER_FAIL, 'error_status_word_4', 0b00001000),
+    (Names.SPURIOUS_DSP_INTERRUPT, 'error_status_word_4', 0b00010000),
+    (Names.SPURIOUS_UART_INTERRUPT, 'error_status_word_4', 0b00100000),
+    (Names.SPURIOUS_CLOCK_INTERRUPT, 'error_status_word_4', 0b01000000),
+    (Names.LEVEL_7_INTERRUPT, 'error_status_word_4', 0b10000000),
+)
+
+# the per depth cell fields, their dtype and the fill of the cells past an
+# ensemble's num_cells (-32768 is the PD0 bad velocity)
+_CELL_FIELDS = {
+    Names.WATER_VELOCITY_EAST: ('<i2', -32768),
+    Names.WATER_VELOCITY_NORTH: ('<i2', -32768),
+    Names.WATER_VELOCITY_UP: ('<i2', -32768),
+    Names.ERROR_VELOCITY: ('<i2', -32768),
+    Names.CORRELATION_MAGNITUDE_BEAM1: (np.uint8, 0),
+    Names.CORRELATION_MAGNITUDE_BEAM2: (np.uint8, 0),
+    Names.CORRELATION_MAGNITUDE_BEAM3: (np.uint8, 0),
+    Names.CORRELATION_MAGNITUDE_BEAM4: (np.uint8, 0),
+    Names.ECHO_INTENSITY_BEAM1: (np.uint8, 0),
+    Names.ECHO_INTENSITY_BEAM2: (np.uint8, 0),
+    Names.ECHO_INTENSITY_BEAM3: (np.uint8, 0),
+    Names.ECHO_INTENSITY_BEAM4: (np.uint8, 0),
+    Names.PERCENT_GOOD_3BEAM: (np.uint8, 0),
+    Names.PERCENT_TRANSFORMS_REJECT: (np.uint8, 0),
+    Names.PERCENT_BAD_BEAMS: (np.uint8, 0),
+    Names.PERCENT_GOOD_4BEAM: (np.uint8, 0),
+}
+
+# the fields with a row of values per ensemble, up to 7 data type offsets and
+# the 7 real time clock values
+_ROW_FIELDS = (Names.OFFSET_DATA_TYPES, Names.REAL_TIME_CLOCK)
+
+# the float fields, nan until they are parsed; the bottom track fields stay
+# nan for the ensembles without one
+_FLOAT_FIELDS = frozenset(
+    (Names.TIME_PER_PING_SECONDS, Names.ENSEMBLE_START_TIME, Names.MPT_SECONDS,
+     Names.LOW_LATENCY_TRIGGER) +
+    tuple(name for name in _BT_FIELDS if name != 'RESERVED'))
+
 class DVLdata(object):
     """
+    The parsed fields of a PD0 file, an array per field with a row per
+    ensemble.  The per depth cell fields are (ensembles, max_cells) arrays,
+    and the offsets and real time clock are (ensembles, 7) arrays.
+
+    The arrays are filled before parsing, so the values an ensemble doesn't
+    have are left as:
+        -32768 past the last depth cell of the velocity fields (int16)
+        0 past the last depth cell of the correlation, echo intensity and
+            percent good fields (uint8)
+        0 past the number of data types of the offsets, and for the real
+            time clock of an ensemble without a variable leader (int64)
+        nan for the float fields (the time per ping, start time, MPT
+            seconds and low latency trigger) and for the bottom track
+            fields of an ensemble without a bottom track
+        0 for the other (int64) fields
     """
-    def __init__(self):
+    def __init__(self, n_ensembles=0, max_cells=0):
         """
         """
-        # self._data_dict = {}
-        for key in Names.__dict__.keys():
-            if not(key.startswith('_')):
-                self.__dict__[Names.__dict__[key]] = []
+        for name in _NAME_VALUES:
+            if name in _CELL_FIELDS:
+                dtype, fill = _CELL_FIELDS[name]
+                value = np.full((n_ensembles, max_cells), fill, dtype=dtype)
+            elif name in _ROW_FIELDS:
+                value = np.zeros((n_ensembles, 7), dtype=np.int64)
+            elif name in _FLOAT_FIELDS:
+                value = np.full(n_ensembles, np.nan)
+            else:
+                value = np.zeros(n_ensembles, dtype=np.int64)
+            self.__dict__[name] = value
     def __getitem__(self, key):
         return self.__dict__[key]
     
@@ -280,130 +507,307 @@ class DVLparser(object):
     def __init__(self, infile):
         """
         """
-        self._dvl = DVLdata()
         with open(infile, 'rb') as f:
             # read in the pd0 data file and find the indexes to the record markers
             data = f.read()
         record_markerpt = [m.start() for m in DVL_PD0_REGEX.finditer(data)]
 
-        # now parse the file, ensemble by ensemble
-        for startpt in record_markerpt:
+        if _HAVE_NUMBA:
+            _compile_kernels(vars(_pd0))
+            self._parse_ensembles(data, record_markerpt)
+            return
+
+        # a first pass peeks at the number of depth cells of each ensemble,
+        # to size the arrays for all of the ensembles up front
+        num_cells = _num_cells(data, record_markerpt)
+        self._dvl = DVLdata(len(record_markerpt), num_cells.max(initial=0))
+
+        # now parse the file, ensemble by ensemble.  Ensembles and their
+        # data type chunks are sliced from a memoryview of the file data, so
+        # no slice copies the bytes.
+        data_view = memoryview(data)
+        for k, startpt in enumerate(record_markerpt):
             # particalize the data block received and return the results
-            numBytes = unpack("<H", data[startpt+2:startpt+4])[0]
-            ensemble = data[startpt:startpt+numBytes+2]
+            numBytes = _U16.unpack_from(data, startpt+2)[0]
+            ensemble = data_view[startpt:startpt+numBytes+2]
 
             # sample = FilteringParser._extract_sample(ADCPA_PD0_PARSED_DataParticle,
                                                      # DVL_PD0_REGEX,
                                                      # ensemble)
-            self._build_parsed_values(ensemble)
+            self._build_parsed_values(ensemble, k)
 
     def return_data(self):
         return self._dvl
 
-    def _build_parsed_values(self, ensemble):
+    def _parse_ensembles(self, data, record_markerpt):
+        """
+        Parse all of the ensembles at once with the compiled kernel, which
+        gathers each data type into a table of packed records, then read the
+        tables with numpy a whole field (column) at a time.
+        """
+        data = np.frombuffer(data, dtype=np.uint8)
+        starts = np.array(record_markerpt, dtype=np.int64)
+        n = starts.size
+        num_cells = _pd0.num_cells(data, starts)
+        max_cells = int(num_cells.max(initial=0))
+
+        checksums = np.zeros(n, dtype=np.int64)
+        header = np.zeros((n, _HDR_DTYPE.itemsize), dtype=np.uint8)
+        offsets = np.zeros((n, _pd0.MAX_DATA_TYPES), dtype=np.int64)
+        fixed = np.zeros((n, _FIXED_DTYPE.itemsize), dtype=np.uint8)
+        variable = np.zeros((n, _VAR_DTYPE.itemsize), dtype=np.uint8)
+        bottom_track = np.zeros((n, _BT_DTYPE.itemsize), dtype=np.uint8)
+        has_fixed = np.zeros(n, dtype=np.bool_)
+        has_variable = np.zeros(n, dtype=np.bool_)
+        has_bt = np.zeros(n, dtype=np.bool_)
+        velocity = np.zeros((n, 2 + 8*max_cells), dtype=np.uint8)
+        correlation = np.zeros((n, 2 + 4*max_cells), dtype=np.uint8)
+        echo = np.zeros_like(correlation)
+        percent_good = np.zeros_like(correlation)
+        bad, problem = _pd0.parse_ensembles(
+            data, starts, checksums, header, offsets, fixed, variable,
+            bottom_track, has_fixed, has_variable, has_bt, velocity,
+            correlation, echo, percent_good)
+        if problem == _pd0.CHECKSUM_MISMATCH:
+            length = _pd0.u16(data, starts[bad] + 2)
+            ensemble_checksum = _pd0.u16(data, starts[bad] + length)
+            print("Checksum mismatch " + str(checksums[bad]) + " != "
+                      + str(ensemble_checksum))
+            raise SampleException("Checksum mismatch")
+        if problem == _pd0.CUT_SHORT:
+            raise SampleException("Ensemble is cut short")
+
+        def table(raw, dtype):
+            """the named int64 fields of a table of packed records"""
+            records = raw.view(dtype)[:, 0]
+            return {name: records[name].astype(np.int64)
+                    for name in dtype.names}
+        header = table(header, _HDR_DTYPE)
+        fixed = table(fixed, _FIXED_DTYPE)
+        variable = table(variable, _VAR_DTYPE)
+        bt = table(bottom_track, _BT_DTYPE)
+        # only the ensembles with a leader are checked, like the python path
+        fixed = {name: field[has_fixed] for name, field in fixed.items()}
+        variable = {name: field[has_variable]
+                    for name, field in variable.items()}
+        for name, value, message in (
+                ('fixed_leader_id', 0, "fixed_leader_id was not equal to 0"),
+                ('data_flag', 0, "data_flag was not equal to 0"),
+                ('signal_processing_mode', 1,
+                 "signal_processing_mode was not equal to 1")):
+            if np.any(fixed[name] != value):
+                raise SampleException(message)
+        if np.any(variable['variable_leader_id'] != 128):
+            raise SampleException("variable_leader_id was not equal to 128")
+        if np.any((variable['rtc_month'] < 1) | (variable['rtc_month'] > 12)):
+            raise SampleException("real time clock month was not 1 to 12")
+
+        columns = {Names.CHECKSUM: checksums}
+        for name in (Names.HEADER_ID, Names.DATA_SOURCE_ID, Names.NUM_BYTES,
+                     Names.NUM_DATA_TYPES):
+            columns[name] = header[name]
+
+        # fixed leader, the columns of the ensembles that have one
+        fixed_columns = {}
+        for name in (Names.FIXED_LEADER_ID, Names.FIRMWARE_VERSION,
+                     Names.FIRMWARE_REVISION, Names.DATA_FLAG, Names.LAG_LENGTH,
+                     Names.NUM_BEAMS, Names.NUM_CELLS, Names.PINGS_PER_ENSEMBLE,
+                     Names.DEPTH_CELL_LENGTH, Names.BLANK_AFTER_TRANSMIT,
+                     Names.SIGNAL_PROCESSING_MODE, Names.LOW_CORR_THRESHOLD,
+                     Names.NUM_CODE_REPETITIONS, Names.PERCENT_GOOD_MIN,
+                     Names.ERROR_VEL_THRESHOLD, Names.TIME_PER_PING_MINUTES,
+                     Names.HEADING_ALIGNMENT, Names.HEADING_BIAS,
+                     Names.BIN_1_DISTANCE, Names.TRANSMIT_PULSE_LENGTH,
+                     Names.REFERENCE_LAYER_START, Names.REFERENCE_LAYER_STOP,
+                     Names.FALSE_TARGET_THRESHOLD, Names.TRANSMIT_LAG_DISTANCE,
+                     Names.SYSTEM_BANDWIDTH, Names.SERIAL_NUMBER):
+            fixed_columns[name] = fixed[name]
+        sysconfig = fixed['sysconfig_frequency']
+        fixed_columns[Names.SYSCONFIG_FREQUENCY] = np.take(
+            _FREQUENCIES, sysconfig & 0b00000111)
+        fixed_columns[Names.SYSCONFIG_SENSOR_CONFIG] = (sysconfig >> 4) & 0b11
+        fixed_columns[Names.TIME_PER_PING_SECONDS] = (
+            fixed['time_per_ping_seconds'] +
+            fixed['time_per_ping_hundredths']/100)
+        fixed_columns[Names.COORD_TRANSFORM_TYPE] = (
+            fixed['coord_transform_type'] >> 3) & 0b11
+        for name, register, mask in _FIXED_BITS:
+            fixed_columns[name] = (
+                fixed[register] & mask != 0).astype(np.int64)
+
+        # variable leader, the columns of the ensembles that have one
+        variable_columns = {}
+        for name in (Names.VARIABLE_LEADER_ID, Names.ENSEMBLE_NUMBER,
+                     Names.ENSEMBLE_NUMBER_INCREMENT, Names.SPEED_OF_SOUND,
+                     Names.TRANSDUCER_DEPTH, Names.HEADING, Names.PITCH,
+                     Names.ROLL, Names.SALINITY, Names.TEMPERATURE,
+                     Names.MPT_MINUTES, Names.HEADING_STDEV, Names.PITCH_STDEV,
+                     Names.ROLL_STDEV, Names.ADC_TRANSMIT_CURRENT,
+                     Names.ADC_TRANSMIT_VOLTAGE, Names.ADC_AMBIENT_TEMP,
+                     Names.ADC_PRESSURE_PLUS, Names.ADC_PRESSURE_MINUS,
+                     Names.ADC_ATTITUDE_TEMP, Names.ADC_ATTITUDE,
+                     Names.ADC_CONTAMINATION_SENSOR, Names.PRESSURE,
+                     Names.PRESSURE_VARIANCE):
+            variable_columns[name] = variable[name]
+        rtc = [variable['rtc_' + field] for field in (
+            'year', 'month', 'day', 'hour', 'minute', 'second', 'hundredths')]
+        variable_columns[Names.REAL_TIME_CLOCK] = np.stack(rtc, axis=1)
+        variable_columns[Names.ENSEMBLE_START_TIME] = _epoch_seconds_array(
+            2000 + rtc[0], *rtc[1:6]) + (rtc[6] / 100.0)
+        variable_columns[Names.MPT_SECONDS] = (
+            variable['mpt_seconds_component'] +
+            variable['mpt_hundredths_component']/100)
+        for name, register, mask in _VARIABLE_BITS:
+            variable_columns[name] = (
+                variable[register] & mask != 0).astype(np.int64)
+
+        dvl = self._dvl = DVLdata(n, max_cells)
+        for rows, group in ((slice(None), columns),
+                            (has_fixed, fixed_columns),
+                            (has_variable, variable_columns)):
+            for name, column in group.items():
+                dvl[name][rows] = column
+        dvl[Names.OFFSET_DATA_TYPES][:] = offsets
+        # bottom track, left nan for ensembles without it
+        for name in _BT_FIELDS:
+            if name != 'RESERVED':
+                dvl[name][has_bt] = bt[name][has_bt]
+        # the depth cells of each ensemble, the rest of its row is padding
+        valid = np.arange(max_cells) < num_cells[:, np.newaxis]
+        for raw, dtype, id_name, names in (
+                (velocity, '<i2', Names.VELOCITY_DATA_ID,
+                 (Names.WATER_VELOCITY_EAST, Names.WATER_VELOCITY_NORTH,
+                  Names.WATER_VELOCITY_UP, Names.ERROR_VELOCITY)),
+                (correlation, np.uint8, Names.CORRELATION_MAGNITUDE_ID,
+                 (Names.CORRELATION_MAGNITUDE_BEAM1,
+                  Names.CORRELATION_MAGNITUDE_BEAM2,
+                  Names.CORRELATION_MAGNITUDE_BEAM3,
+                  Names.CORRELATION_MAGNITUDE_BEAM4)),
+                (echo, np.uint8, Names.ECHO_INTENSITY_ID,
+                 (Names.ECHO_INTENSITY_BEAM1, Names.ECHO_INTENSITY_BEAM2,
+                  Names.ECHO_INTENSITY_BEAM3, Names.ECHO_INTENSITY_BEAM4)),
+                (percent_good, np.uint8, Names.PERCENT_GOOD_ID,
+                 (Names.PERCENT_GOOD_3BEAM, Names.PERCENT_TRANSFORMS_REJECT,
+                  Names.PERCENT_BAD_BEAMS, Names.PERCENT_GOOD_4BEAM))):
+            dvl[id_name][:] = (raw[:, 0].astype(np.int64) |
+                               (raw[:, 1].astype(np.int64) << 8))
+            cells = raw[:, 2:].view(dtype).reshape(n, max_cells, 4)
+            for beam, name in enumerate(names):
+                dvl[name][valid] = cells[:, :, beam][valid]
+
+        if has_fixed.any():
+            # as left by the last fixed leader
+            self.num_depth_cells = int(fixed['num_cells'][-1])
+            self.coord_transform_type = int(
+                fixed_columns[Names.COORD_TRANSFORM_TYPE][-1])
+
+    def _build_parsed_values(self, ensemble, k):
         """
         Parse the beginning portion of the ensemble (Header Data)
         """
 
-        length = unpack("<H", ensemble[2:4])[0]
-        data = str(ensemble)
+        length = _U16.unpack_from(ensemble, 2)[0]
+        if length < 6 or len(ensemble) < length + 2:
+            raise SampleException("Ensemble is cut short")
 
-        # Calculate the checksum
-        total = int(0)
-        for i in range(0, length):
-            total += int(ord(data[i]))
+        # Calculate the checksum, the sum of the ensemble bytes before it
+        total = int(np.frombuffer(ensemble, dtype=np.uint8, count=length).sum())
 
         checksum = total & 65535    # bitwise and with 65535 or mod vs 65536
 
-        if checksum != unpack("<H", ensemble[length: length+2])[0]:
+        ensemble_checksum = _U16.unpack_from(ensemble, length)[0]
+        if checksum != ensemble_checksum:
             print("Checksum mismatch " + str(checksum) + " != "
-                      + str(unpack("<H", ensemble[length: length+2])[0]))
+                      + str(ensemble_checksum))
             raise SampleException("Checksum mismatch")
 
         # save the checksum and process the remainder of the ensemble
-        self._dvl[Names.CHECKSUM].append(checksum)
+        self._dvl[Names.CHECKSUM][k] = checksum
 
         (header_id, data_source_id, num_bytes, spare, num_data_types) = \
-            unpack('<BBHBB', ensemble[0:6])
+            _HDR_STRUCT.unpack_from(ensemble, 0)
 
-        self._dvl[Names.HEADER_ID].append(header_id)
-        self._dvl[Names.DATA_SOURCE_ID].append(data_source_id)
-        self._dvl[Names.NUM_BYTES].append(num_bytes)
-        self._dvl[Names.NUM_DATA_TYPES].append(num_data_types)
+        self._dvl[Names.HEADER_ID][k] = header_id
+        self._dvl[Names.DATA_SOURCE_ID][k] = data_source_id
+        self._dvl[Names.NUM_BYTES][k] = num_bytes
+        self._dvl[Names.NUM_DATA_TYPES][k] = num_data_types
 
+        # any data types past the ExplorerDVL's 7 are ignored
+        num_data_types = min(num_data_types, _pd0.MAX_DATA_TYPES)
         offsets = []    # create list for offsets
         strt = 6        # offsets start at byte 6 (using 0 indexing)
         nDT = 1         # counter for n data types
         while nDT <= num_data_types:
-            value = unpack('<H', ensemble[strt:strt+2])[0]
+            value = _U16.unpack_from(_chunk(ensemble, strt, 2, length))[0]
             offsets.append(value)
             strt += 2
             nDT += 1
 
-        self._dvl[Names.OFFSET_DATA_TYPES].append(offsets)
+        self._dvl[Names.OFFSET_DATA_TYPES][k, :num_data_types] = offsets
         
         bt_not_included = True
+        iCells = 0      # no depth cells until the fixed leader gives them
         for offset in offsets:
             # for each offset, using the starting byte, determine the data type
             # and then parse accordingly.
-            data_type = unpack('<H', ensemble[offset:offset+2])[0]
+            data_type = _U16.unpack_from(_chunk(ensemble, offset, 2, length))[0]
 
             # fixed leader data (x00x00)
             if data_type == 0:
-                chunk = ensemble[offset:offset+58]
-                self.parse_fixed_chunk(chunk)
+                chunk = _chunk(ensemble, offset, 58, length)
+                self.parse_fixed_chunk(chunk, k)
                 iCells = self.num_depth_cells   # grab the # of depth cells
                                                 # obtained from the fixed leader
                                                 # data type
 
             # variable leader data (x80x00)
             if data_type == 128:
-                chunk = ensemble[offset:offset+60]
-                self.parse_variable_chunk(chunk)
+                chunk = _chunk(ensemble, offset, 60, length)
+                self.parse_variable_chunk(chunk, k)
 
             # velocity data (x00x01)
             if data_type == 256:
                 # number of bytes is a function of the user selectable number of
                 # depth cells (WN command), calculated above
                 nBytes = 2 + 8 * iCells
-                chunk = ensemble[offset:offset+nBytes]
-                self.parse_velocity_chunk(chunk)
+                chunk = _chunk(ensemble, offset, nBytes, length)
+                self.parse_velocity_chunk(chunk, k)
 
             # correlation magnitude data (x00x02)
             if data_type == 512:
                 # number of bytes is a function of the user selectable number of
                 # depth cells (WN command), calculated above
                 nBytes = 2 + 4 * iCells
-                chunk = ensemble[offset:offset+nBytes]
-                self.parse_corelation_magnitude_chunk(chunk)
+                chunk = _chunk(ensemble, offset, nBytes, length)
+                self.parse_corelation_magnitude_chunk(chunk, k)
 
             # echo intensity data (x00x03)
             if data_type == 768:
                 # number of bytes is a function of the user selectable number of
                 # depth cells (WN command), calculated above
                 nBytes = 2 + 4 * iCells
-                chunk = ensemble[offset:offset+nBytes]
-                self.parse_echo_intensity_chunk(chunk)
+                chunk = _chunk(ensemble, offset, nBytes, length)
+                self.parse_echo_intensity_chunk(chunk, k)
 
             # percent-good data (x00x04)
             if data_type == 1024:
                 # number of bytes is a function of the user selectable number of
                 # depth cells (WN command), calculated above
                 nBytes = 2 + 4 * iCells
-                chunk = ensemble[offset:offset+nBytes]
-                self.parse_percent_good_chunk(chunk)
+                chunk = _chunk(ensemble, offset, nBytes, length)
+                self.parse_percent_good_chunk(chunk, k)
 
             # bottom track data (x00x06)
             if data_type == 1536:
-                chunk = ensemble[offset:offset+81]
-                self.parse_bottom_track_chunk(chunk)
+                chunk = _chunk(ensemble, offset, 81, length)
+                self.parse_bottom_track_chunk(chunk, k)
                 bt_not_included = False
 
         if bt_not_included:
-            self.fill_bt_nans()
+            self.fill_bt_nans(k)
 
 
-    def parse_fixed_chunk(self, chunk):
+    def parse_fixed_chunk(self, chunk, k):
         """
         Parse the fixed leader portion of the particle
 
@@ -420,7 +824,7 @@ class DVLparser(object):
          reference_layer_stop, false_target_threshold, SPARE1,
          transmit_lag_distance, SPARE2, system_bandwidth,
          SPARE3, SPARE4, serial_number) = \
-            unpack('<HBBHBBBBHHHBBBBHBBBBhhBBHHBBBBHQHBBI', chunk)
+            _FIXED_STRUCT.unpack_from(chunk)
 
         if 0 != fixed_leader_id:
             raise SampleException("fixed_leader_id was not equal to 0")
@@ -428,83 +832,71 @@ class DVLparser(object):
         # store the number of depth cells for use elsewhere
         self.num_depth_cells = num_cells
 
-        self._dvl[Names.FIXED_LEADER_ID].append(fixed_leader_id)
-        self._dvl[Names.FIRMWARE_VERSION].append(firmware_version)
-        self._dvl[Names.FIRMWARE_REVISION].append(firmware_revision)
-
-        frequencies = [75, 150, 300, 600, 1200, 2400]
+        self._dvl[Names.FIXED_LEADER_ID][k] = fixed_leader_id
+        self._dvl[Names.FIRMWARE_VERSION][k] = firmware_version
+        self._dvl[Names.FIRMWARE_REVISION][k] = firmware_revision
 
-        self._dvl[Names.SYSCONFIG_FREQUENCY].append(frequencies[sysconfig_frequency & 0b00000111])
-        self._dvl[Names.SYSCONFIG_BEAM_PATTERN].append(1 if sysconfig_frequency & 0b00001000 else 0)
-        self._dvl[Names.SYSCONFIG_SENSOR_CONFIG].append(sysconfig_frequency & 0b00110000 >> 4)
-        self._dvl[Names.SYSCONFIG_HEAD_ATTACHED].append(1 if sysconfig_frequency & 0b01000000 else 0)
-        self._dvl[Names.SYSCONFIG_VERTICAL_ORIENTATION].append(1 if sysconfig_frequency & 0b10000000 else 0)
+        self._dvl[Names.SYSCONFIG_FREQUENCY][k] = _FREQUENCIES[sysconfig_frequency & 0b00000111]
+        self._dvl[Names.SYSCONFIG_SENSOR_CONFIG][k] = (sysconfig_frequency >> 4) & 0b11
 
         if 0 != data_flag:
             raise SampleException("data_flag was not equal to 0")
 
-        self._dvl[Names.DATA_FLAG].append(data_flag)
-        self._dvl[Names.LAG_LENGTH].append(lag_length)
-        self._dvl[Names.NUM_BEAMS].append(num_beams)
-        self._dvl[Names.NUM_CELLS].append(num_cells)
-        self._dvl[Names.PINGS_PER_ENSEMBLE].append(pings_per_ensemble)
-        self._dvl[Names.DEPTH_CELL_LENGTH].append(depth_cell_length)
-        self._dvl[Names.BLANK_AFTER_TRANSMIT].append(blank_after_transmit)
+        self._dvl[Names.DATA_FLAG][k] = data_flag
+        self._dvl[Names.LAG_LENGTH][k] = lag_length
+        self._dvl[Names.NUM_BEAMS][k] = num_beams
+        self._dvl[Names.NUM_CELLS][k] = num_cells
+        self._dvl[Names.PINGS_PER_ENSEMBLE][k] = pings_per_ensemble
+        self._dvl[Names.DEPTH_CELL_LENGTH][k] = depth_cell_length
+        self._dvl[Names.BLANK_AFTER_TRANSMIT][k] = blank_after_transmit
 
         if 1 != signal_processing_mode:
             raise SampleException("signal_processing_mode was not equal to 1")
 
-        self._dvl[Names.SIGNAL_PROCESSING_MODE].append(signal_processing_mode)
-        self._dvl[Names.LOW_CORR_THRESHOLD].append(low_corr_threshold)
-        self._dvl[Names.NUM_CODE_REPETITIONS].append(num_code_repetitions)
-        self._dvl[Names.PERCENT_GOOD_MIN].append(percent_good_min)
-        self._dvl[Names.ERROR_VEL_THRESHOLD].append(error_vel_threshold)
-        self._dvl[Names.TIME_PER_PING_MINUTES].append(time_per_ping_minutes)
+        self._dvl[Names.SIGNAL_PROCESSING_MODE][k] = signal_processing_mode
+        self._dvl[Names.LOW_CORR_THRESHOLD][k] = low_corr_threshold
+        self._dvl[Names.NUM_CODE_REPETITIONS][k] = num_code_repetitions
+        self._dvl[Names.PERCENT_GOOD_MIN][k] = percent_good_min
+        self._dvl[Names.ERROR_VEL_THRESHOLD][k] = error_vel_threshold
+        self._dvl[Names.TIME_PER_PING_MINUTES][k] = time_per_ping_minutes
 
         tpp_float_seconds = float(time_per_ping_seconds + (time_per_ping_hundredths/100))
-        self._dvl[Names.TIME_PER_PING_SECONDS].append(tpp_float_seconds)
-        self._dvl[Names.COORD_TRANSFORM_TYPE].append(coord_transform_type & 0b00011000 >> 3)
-        self._dvl[Names.COORD_TRANSFORM_TILTS].append(1 if coord_transform_type & 0b00000100 else 0)
-        self._dvl[Names.COORD_TRANSFORM_BEAMS].append(1 if coord_transform_type & 0b0000000 else 0)
-        self._dvl[Names.COORD_TRANSFORM_MAPPING].append(1 if coord_transform_type & 0b00000001 else 0)
-
+        self._dvl[Names.TIME_PER_PING_SECONDS][k] = tpp_float_seconds
         # lame, but expedient - mask off un-needed bits
-        self.coord_transform_type = (coord_transform_type & 0b00011000) >> 3
-
-        self._dvl[Names.HEADING_ALIGNMENT].append(heading_alignment)
-        self._dvl[Names.HEADING_BIAS].append(heading_bias)
-        self._dvl[Names.SENSOR_SOURCE_SPEED].append(1 if sensor_source & 0b01000000 else 0)
-        self._dvl[Names.SENSOR_SOURCE_DEPTH].append(1 if sensor_source & 0b00100000 else 0)
-        self._dvl[Names.SENSOR_SOURCE_HEADING].append(1 if sensor_source & 0b00010000 else 0)
-        self._dvl[Names.SENSOR_SOURCE_PITCH].append(1 if sensor_source & 0b00001000 else 0)
-        self._dvl[Names.SENSOR_SOURCE_ROLL].append(1 if sensor_source & 0b00000100 else 0)
-        self._dvl[Names.SENSOR_SOURCE_CONDUCTIVITY].append(1 if sensor_source & 0b00000010 else 0)
-        self._dvl[Names.SENSOR_SOURCE_TEMPERATURE].append(1 if sensor_source & 0b00000001 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_DEPTH].append(1 if sensor_available & 0b00100000 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_HEADING].append(1 if sensor_available & 0b00010000 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_PITCH].append(1 if sensor_available & 0b00001000 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_ROLL].append(1 if sensor_available & 0b00000100 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_CONDUCTIVITY].append(1 if sensor_available & 0b00000010 else 0)
-        self._dvl[Names.SENSOR_AVAILABLE_TEMPERATURE].append(1 if sensor_available & 0b00000001 else 0)
-        self._dvl[Names.BIN_1_DISTANCE].append(bin_1_distance)
-        self._dvl[Names.TRANSMIT_PULSE_LENGTH].append(transmit_pulse_length)
-        self._dvl[Names.REFERENCE_LAYER_START].append(reference_layer_start)
-        self._dvl[Names.REFERENCE_LAYER_STOP].append(reference_layer_stop)
-        self._dvl[Names.FALSE_TARGET_THRESHOLD].append(false_target_threshold)
-        self._dvl[Names.TRANSMIT_LAG_DISTANCE].append(transmit_lag_distance)
-        self._dvl[Names.SYSTEM_BANDWIDTH].append(system_bandwidth)
-        self._dvl[Names.SERIAL_NUMBER].append(serial_number)
-
-    def parse_variable_chunk(self, chunk):
+        self.coord_transform_type = (coord_transform_type >> 3) & 0b11
+        self._dvl[Names.COORD_TRANSFORM_TYPE][k] = self.coord_transform_type
+
+        self._dvl[Names.HEADING_ALIGNMENT][k] = heading_alignment
+        self._dvl[Names.HEADING_BIAS][k] = heading_bias
+
+        # the single bit flags of the sysconfig, coordinate transform and
+        # sensor registers
+        registers = {'sysconfig_frequency': sysconfig_frequency,
+                     'coord_transform_type': coord_transform_type,
+                     'sensor_source': sensor_source,
+                     'sensor_available': sensor_available}
+        dvl = self._dvl
+        for name, register, mask in _FIXED_BITS:
+            dvl[name][k] = 1 if registers[register] & mask else 0
+
+        self._dvl[Names.BIN_1_DISTANCE][k] = bin_1_distance
+        self._dvl[Names.TRANSMIT_PULSE_LENGTH][k] = transmit_pulse_length
+        self._dvl[Names.REFERENCE_LAYER_START][k] = reference_layer_start
+        self._dvl[Names.REFERENCE_LAYER_STOP][k] = reference_layer_stop
+        self._dvl[Names.FALSE_TARGET_THRESHOLD][k] = false_target_threshold
+        self._dvl[Names.TRANSMIT_LAG_DISTANCE][k] = transmit_lag_distance
+        self._dvl[Names.SYSTEM_BANDWIDTH][k] = system_bandwidth
+        self._dvl[Names.SERIAL_NUMBER][k] = serial_number
+
+    def parse_variable_chunk(self, chunk, k):
         """
         Parse the variable leader portion of the particle
 
         @throws SampleException If there is a problem with sample creation
         """
-        rtc = {}
-        (variable_leader_id, ensemble_number, rtc['year'], rtc['month'],
-         rtc['day'], rtc['hour'], rtc['minute'], rtc['second'],
-         rtc['hundredths'], ensemble_number_increment, error_bit_field,
+        (variable_leader_id, ensemble_number, rtc_year, rtc_month,
+         rtc_day, rtc_hour, rtc_minute, rtc_second,
+         rtc_hundredths, ensemble_number_increment, error_bit_field,
          reserved_error_bit_field, speed_of_sound, transducer_depth, heading,
          pitch, roll, salinity, temperature, mpt_minutes, mpt_seconds_component,
          mpt_hundredths_component, heading_stdev, pitch_stdev, roll_stdev,
@@ -513,202 +905,150 @@ class DVLparser(object):
          adc_attitiude, adc_contamination_sensor, error_status_word_1,
          error_status_word_2, error_status_word_3, error_status_word_4,
          SPARE1, pressure, pressure_variance, SPARE2) = \
-            unpack('<HHBBBBBBBBBBHHHhhHhBBBBBBBBBBBBBBBBBBHIII', chunk)
+            _VAR_STRUCT.unpack_from(chunk)
 
         if 128 != variable_leader_id:
             raise SampleException("variable_leader_id was not equal to 128")
 
-        self._dvl[Names.VARIABLE_LEADER_ID].append(variable_leader_id)
-        self._dvl[Names.ENSEMBLE_NUMBER].append(ensemble_number)
-        self._dvl[Names.ENSEMBLE_NUMBER_INCREMENT].append(ensemble_number_increment)
-
-        # convert individual date and time values to datetime object and
-        # calculate the NTP timestamp (seconds since Jan 1, 1900), per OOI
-        # convention
-        dts = dt.datetime(2000 + rtc['year'], rtc['month'], rtc['day'],
-                          rtc['hour'], rtc['minute'], rtc['second'])
-        epts = timegm(dts.timetuple()) + (rtc['hundredths'] / 100.0)  # seconds since 1970-01-01 in UTC
+        self._dvl[Names.VARIABLE_LEADER_ID][k] = variable_leader_id
+        self._dvl[Names.ENSEMBLE_NUMBER][k] = ensemble_number
+        self._dvl[Names.ENSEMBLE_NUMBER_INCREMENT][k] = ensemble_number_increment
+
+        # convert individual date and time values to seconds since
+        # 1970-01-01 in UTC, and the NTP timestamp (seconds since Jan 1,
+        # 1900) per OOI convention
+        if not 1 <= rtc_month <= 12:
+            raise SampleException("real time clock month was not 1 to 12")
+        epts = _epoch_seconds(2000 + rtc_year, rtc_month, rtc_day, rtc_hour,
+                              rtc_minute, rtc_second) + (rtc_hundredths / 100.0)
         ntpts = epts + 2208988800
 
-        self._dvl[Names.REAL_TIME_CLOCK].append([rtc['year'], rtc['month'], rtc['day'],
-                                                         rtc['hour'], rtc['minute'], rtc['second'], rtc['hundredths']])
-        self._dvl[Names.ENSEMBLE_START_TIME].append(epts)
-        # self._dvl[Names.INTERNAL_TIMESTAMP].append(epts)
-
-        self._dvl[Names.BIT_RESULT_DEMOD_1].append(1 if error_bit_field & 0b00001000 else 0)
-        self._dvl[Names.BIT_RESULT_DEMOD_2].append(1 if error_bit_field & 0b00010000 else 0)
-        self._dvl[Names.BIT_RESULT_TIMING].append(1 if error_bit_field & 0b00000010 else 0)
-        self._dvl[Names.SPEED_OF_SOUND].append(speed_of_sound)
-        self._dvl[Names.TRANSDUCER_DEPTH].append(transducer_depth)
-        self._dvl[Names.HEADING].append(heading)
-        self._dvl[Names.PITCH].append(pitch)
-        self._dvl[Names.ROLL].append(roll)
-        self._dvl[Names.SALINITY].append(salinity)
-        self._dvl[Names.TEMPERATURE].append(temperature)
-        self._dvl[Names.MPT_MINUTES].append(mpt_minutes)
+        self._dvl[Names.REAL_TIME_CLOCK][k] = [rtc_year, rtc_month, rtc_day,
+                                               rtc_hour, rtc_minute, rtc_second, rtc_hundredths]
+        self._dvl[Names.ENSEMBLE_START_TIME][k] = epts
+        # self._dvl[Names.INTERNAL_TIMESTAMP][k] = epts
+
+        self._dvl[Names.SPEED_OF_SOUND][k] = speed_of_sound
+        self._dvl[Names.TRANSDUCER_DEPTH][k] = transducer_depth
+        self._dvl[Names.HEADING][k] = heading
+        self._dvl[Names.PITCH][k] = pitch
+        self._dvl[Names.ROLL][k] = roll
+        self._dvl[Names.SALINITY][k] = salinity
+        self._dvl[Names.TEMPERATURE][k] = temperature
+        self._dvl[Names.MPT_MINUTES][k] = mpt_minutes
 
         mpt_seconds = float(mpt_seconds_component + (mpt_hundredths_component/100))
-        self._dvl[Names.MPT_SECONDS].append(mpt_seconds)
-        self._dvl[Names.HEADING_STDEV].append(heading_stdev)
-        self._dvl[Names.PITCH_STDEV].append(pitch_stdev)
-        self._dvl[Names.ROLL_STDEV].append(roll_stdev)
-        self._dvl[Names.ADC_TRANSMIT_CURRENT].append(adc_transmit_current)
-        self._dvl[Names.ADC_TRANSMIT_VOLTAGE].append(adc_transmit_voltage)
-        self._dvl[Names.ADC_AMBIENT_TEMP].append(adc_ambient_temp)
-        self._dvl[Names.ADC_PRESSURE_PLUS].append(adc_pressure_plus)
-        self._dvl[Names.ADC_PRESSURE_MINUS].append(adc_pressure_minus)
-        self._dvl[Names.ADC_ATTITUDE_TEMP].append(adc_attitude_temp)
-        self._dvl[Names.ADC_ATTITUDE].append(adc_attitiude)
-        self._dvl[Names.ADC_CONTAMINATION_SENSOR].append(adc_contamination_sensor)
-        self._dvl[Names.BUS_ERROR_EXCEPTION].append(1 if error_status_word_1 & 0b00000001 else 0)
-        self._dvl[Names.ADDRESS_ERROR_EXCEPTION].append(1 if error_status_word_1 & 0b00000010 else 0)
-        self._dvl[Names.ILLEGAL_INSTRUCTION_EXCEPTION].append(1 if error_status_word_1 & 0b00000100 else 0)
-        self._dvl[Names.ZERO_DIVIDE_INSTRUCTION].append(1 if error_status_word_1 & 0b00001000 else 0)
-        self._dvl[Names.EMULATOR_EXCEPTION].append(1 if error_status_word_1 & 0b00010000 else 0)
-        self._dvl[Names.UNASSIGNED_EXCEPTION].append(1 if error_status_word_1 & 0b00100000 else 0)
-        self._dvl[Names.WATCHDOG_RESTART_OCCURRED].append(1 if error_status_word_1 & 0b01000000 else 0)
-        self._dvl[Names.BATTERY_SAVER_POWER].append(1 if error_status_word_1 & 0b10000000 else 0)
-        self._dvl[Names.PINGING].append(1 if error_status_word_1 & 0b00000001 else 0)
-        self._dvl[Names.COLD_WAKEUP_OCCURRED].append(1 if error_status_word_1 & 0b01000000 else 0)
-        self._dvl[Names.UNKNOWN_WAKEUP_OCCURRED].append(1 if error_status_word_1 & 0b10000000 else 0)
-        self._dvl[Names.CLOCK_READ_ERROR].append(1 if error_status_word_3 & 0b00000001 else 0)
-        self._dvl[Names.UNEXPECTED_ALARM].append(1 if error_status_word_3 & 0b00000010 else 0)
-        self._dvl[Names.CLOCK_JUMP_FORWARD].append(1 if error_status_word_3 & 0b00000100 else 0)
-        self._dvl[Names.CLOCK_JUMP_BACKWARD].append(1 if error_status_word_3 & 0b00001000 else 0)
-        self._dvl[Names.POWER_FAIL].append(1 if error_status_word_4 & 0b00001000 else 0)
-        self._dvl[Names.SPURIOUS_DSP_INTERRUPT].append(1 if error_status_word_4 & 0b00010000 else 0)
-        self._dvl[Names.SPURIOUS_UART_INTERRUPT].append(1 if error_status_word_4 & 0b00100000 else 0)
-        self._dvl[Names.SPURIOUS_CLOCK_INTERRUPT].append(1 if error_status_word_4 & 0b01000000 else 0)
-        self._dvl[Names.LEVEL_7_INTERRUPT].append(1 if error_status_word_4 & 0b10000000 else 0)
-        self._dvl[Names.PRESSURE].append(pressure)
-        self._dvl[Names.PRESSURE_VARIANCE].append(pressure_variance)
-
-    def parse_velocity_chunk(self, chunk):
+        self._dvl[Names.MPT_SECONDS][k] = mpt_seconds
+        self._dvl[Names.HEADING_STDEV][k] = heading_stdev
+        self._dvl[Names.PITCH_STDEV][k] = pitch_stdev
+        self._dvl[Names.ROLL_STDEV][k] = roll_stdev
+        self._dvl[Names.ADC_TRANSMIT_CURRENT][k] = adc_transmit_current
+        self._dvl[Names.ADC_TRANSMIT_VOLTAGE][k] = adc_transmit_voltage
+        self._dvl[Names.ADC_AMBIENT_TEMP][k] = adc_ambient_temp
+        self._dvl[Names.ADC_PRESSURE_PLUS][k] = adc_pressure_plus
+        self._dvl[Names.ADC_PRESSURE_MINUS][k] = adc_pressure_minus
+        self._dvl[Names.ADC_ATTITUDE_TEMP][k] = adc_attitude_temp
+        self._dvl[Names.ADC_ATTITUDE][k] = adc_attitiude
+        self._dvl[Names.ADC_CONTAMINATION_SENSOR][k] = adc_contamination_sensor
+
+        # the single bit flags of the built-in test and error status words
+        registers = {'error_bit_field': error_bit_field,
+                     'error_status_word_1': error_status_word_1,
+                     'error_status_word_3': error_status_word_3,
+                     'error_status_word_4': error_status_word_4}
+        dvl = self._dvl
+        for name, register, mask in _VARIABLE_BITS:
+            dvl[name][k] = 1 if registers[register] & mask else 0
+
+        self._dvl[Names.PRESSURE][k] = pressure
+        self._dvl[Names.PRESSURE_VARIANCE][k] = pressure_variance
+
+    def parse_velocity_chunk(self, chunk, k):
         """
         Parse the velocity portion of the particle
 
         @throws SampleException If there is a problem with sample creation
         """
-        N = (len(chunk) - 2) / 2 / 4
-        offset = 0
-
-        velocity_data_id = unpack("<H", chunk[0:2])[0]
+        velocity_data_id = _U16.unpack_from(chunk)[0]
         if 256 != velocity_data_id:
             raise SampleException("velocity_data_id was not equal to 256")
 
-        self._dvl[Names.VELOCITY_DATA_ID].append(velocity_data_id)
-
-        water_velocity_east = []
-        water_velocity_north = []
-        water_velocity_up = []
-        error_velocity = []
-        for row in range(1, N):
-            (a, b, c, d) = unpack('<hhhh', chunk[offset + 2: offset + 10])
-            water_velocity_east.append(a)
-            water_velocity_north.append(b)
-            water_velocity_up.append(c)
-            error_velocity.append(d)
-            offset += 4 * 2
-        self._dvl[Names.WATER_VELOCITY_EAST].append(water_velocity_east)
-        self._dvl[Names.WATER_VELOCITY_NORTH].append(water_velocity_north)
-        self._dvl[Names.WATER_VELOCITY_UP].append(water_velocity_up)
-        self._dvl[Names.ERROR_VELOCITY].append(error_velocity)
-
-    def parse_corelation_magnitude_chunk(self, chunk):
+        self._dvl[Names.VELOCITY_DATA_ID][k] = velocity_data_id
+
+        # the depth cells are rows of 4 little-endian shorts after the id
+        (water_velocity_east, water_velocity_north, water_velocity_up,
+         error_velocity) = np.frombuffer(
+            chunk, dtype='<i2', offset=2).reshape(-1, 4).T
+        self._dvl[Names.WATER_VELOCITY_EAST][k, :water_velocity_east.size] = water_velocity_east
+        self._dvl[Names.WATER_VELOCITY_NORTH][k, :water_velocity_north.size] = water_velocity_north
+        self._dvl[Names.WATER_VELOCITY_UP][k, :water_velocity_up.size] = water_velocity_up
+        self._dvl[Names.ERROR_VELOCITY][k, :error_velocity.size] = error_velocity
+
+    def parse_corelation_magnitude_chunk(self, chunk, k):
         """
         Parse the corelation magnitude portion of the particle
 
         @throws SampleException If there is a problem with sample creation
         """
-        N = (len(chunk) - 2) / 4
-        offset = 0
-
-        correlation_magnitude_id = unpack("<H", chunk[0:2])[0]
+        correlation_magnitude_id = _U16.unpack_from(chunk)[0]
         if 512 != correlation_magnitude_id:
             raise SampleException("correlation_magnitude_id was not equal to 512")
 
-        self._dvl[Names.CORRELATION_MAGNITUDE_ID].append(correlation_magnitude_id)
-
-        correlation_magnitude_beam1 = []
-        correlation_magnitude_beam2 = []
-        correlation_magnitude_beam3 = []
-        correlation_magnitude_beam4 = []
-        for row in range(1, N):
-            (a, b, c, d) = unpack('<BBBB', chunk[offset + 2: offset + 6])
-            correlation_magnitude_beam1.append(a)
-            correlation_magnitude_beam2.append(b)
-            correlation_magnitude_beam3.append(c)
-            correlation_magnitude_beam4.append(d)
-            offset += 4
-
-        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM1].append(correlation_magnitude_beam1)
-        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM2].append(correlation_magnitude_beam2)
-        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM3].append(correlation_magnitude_beam3)
-        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM4].append(correlation_magnitude_beam4)
-
-    def parse_echo_intensity_chunk(self, chunk):
+        self._dvl[Names.CORRELATION_MAGNITUDE_ID][k] = correlation_magnitude_id
+
+        # the depth cells are rows of 4 bytes, 1 per beam, after the id
+        (correlation_magnitude_beam1, correlation_magnitude_beam2,
+         correlation_magnitude_beam3, correlation_magnitude_beam4) = \
+            np.frombuffer(chunk, dtype=np.uint8, offset=2).reshape(-1, 4).T
+
+        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM1][k, :correlation_magnitude_beam1.size] = correlation_magnitude_beam1
+        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM2][k, :correlation_magnitude_beam2.size] = correlation_magnitude_beam2
+        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM3][k, :correlation_magnitude_beam3.size] = correlation_magnitude_beam3
+        self._dvl[Names.CORRELATION_MAGNITUDE_BEAM4][k, :correlation_magnitude_beam4.size] = correlation_magnitude_beam4
+
+    def parse_echo_intensity_chunk(self, chunk, k):
         """
         Parse the echo intensity portion of the particle
 
         @throws SampleException If there is a problem with sample creation
         """
-        N = (len(chunk) - 2) / 4
-        offset = 0
-
-        echo_intensity_id = unpack("<H", chunk[0:2])[0]
+        echo_intensity_id = _U16.unpack_from(chunk)[0]
         if 768 != echo_intensity_id:
             raise SampleException("echo_intensity_id was not equal to 768")
-        self._dvl[Names.ECHO_INTENSITY_ID].append(echo_intensity_id)
-
-        echo_intesity_beam1 = []
-        echo_intesity_beam2 = []
-        echo_intesity_beam3 = []
-        echo_intesity_beam4 = []
-        for row in range(1, N):
-            (a, b, c, d) = unpack('<BBBB', chunk[offset + 2: offset + 6])
-            echo_intesity_beam1.append(a)
-            echo_intesity_beam2.append(b)
-            echo_intesity_beam3.append(c)
-            echo_intesity_beam4.append(d)
-            offset += 4
-
-        self._dvl[Names.ECHO_INTENSITY_BEAM1].append(echo_intesity_beam1)
-        self._dvl[Names.ECHO_INTENSITY_BEAM2].append(echo_intesity_beam2)
-        self._dvl[Names.ECHO_INTENSITY_BEAM3].append(echo_intesity_beam3)
-        self._dvl[Names.ECHO_INTENSITY_BEAM4].append(echo_intesity_beam4)
-
-    def parse_percent_good_chunk(self, chunk):
+        self._dvl[Names.ECHO_INTENSITY_ID][k] = echo_intensity_id
+
+        # the depth cells are rows of 4 bytes, 1 per beam, after the id
+        (echo_intesity_beam1, echo_intesity_beam2, echo_intesity_beam3,
+         echo_intesity_beam4) = np.frombuffer(
+            chunk, dtype=np.uint8, offset=2).reshape(-1, 4).T
+
+        self._dvl[Names.ECHO_INTENSITY_BEAM1][k, :echo_intesity_beam1.size] = echo_intesity_beam1
+        self._dvl[Names.ECHO_INTENSITY_BEAM2][k, :echo_intesity_beam2.size] = echo_intesity_beam2
+        self._dvl[Names.ECHO_INTENSITY_BEAM3][k, :echo_intesity_beam3.size] = echo_intesity_beam3
+        self._dvl[Names.ECHO_INTENSITY_BEAM4][k, :echo_intesity_beam4.size] = echo_intesity_beam4
+
+    def parse_percent_good_chunk(self, chunk, k):
         """
         Parse the percent good portion of the particle
 
         @throws SampleException If there is a problem with sample creation
         """
-        N = (len(chunk) - 2) / 4
-        offset = 0
-
-        percent_good_id = unpack("<H", chunk[0:2])[0]
+        percent_good_id = _U16.unpack_from(chunk)[0]
         if 1024 != percent_good_id:
             raise SampleException("percent_good_id was not equal to 1024")
 
-        self._dvl[Names.PERCENT_GOOD_ID].append(percent_good_id)
-
-        percent_good_3beam = []
-        percent_transforms_reject = []
-        percent_bad_beams = []
-        percent_good_4beam = []
-        for row in range(1, N):
-            (a, b, c, d) = unpack('<BBBB', chunk[offset + 2: offset + 6])
-            percent_good_3beam.append(a)
-            percent_transforms_reject.append(b)
-            percent_bad_beams.append(c)
-            percent_good_4beam.append(d)
-            offset += 4
-        self._dvl[Names.PERCENT_GOOD_3BEAM].append(percent_good_3beam)
-        self._dvl[Names.PERCENT_TRANSFORMS_REJECT].append(percent_transforms_reject)
-        self._dvl[Names.PERCENT_BAD_BEAMS].append(percent_bad_beams)
-        self._dvl[Names.PERCENT_GOOD_4BEAM].append(percent_good_4beam)
-
-    def parse_bottom_track_chunk(self, chunk):
+        self._dvl[Names.PERCENT_GOOD_ID][k] = percent_good_id
+
+        # the depth cells are rows of 4 bytes after the id
+        (percent_good_3beam, percent_transforms_reject, percent_bad_beams,
+         percent_good_4beam) = np.frombuffer(
+            chunk, dtype=np.uint8, offset=2).reshape(-1, 4).T
+        self._dvl[Names.PERCENT_GOOD_3BEAM][k, :percent_good_3beam.size] = percent_good_3beam
+        self._dvl[Names.PERCENT_TRANSFORMS_REJECT][k, :percent_transforms_reject.size] = percent_transforms_reject
+        self._dvl[Names.PERCENT_BAD_BEAMS][k, :percent_bad_beams.size] = percent_bad_beams
+        self._dvl[Names.PERCENT_GOOD_4BEAM][k, :percent_good_4beam.size] = percent_good_4beam
+
+    def parse_bottom_track_chunk(self, chunk, k):
         """
         Parse the bottom track portion of the particle
 
@@ -733,128 +1073,128 @@ class DVLparser(object):
          beam2_rssi_amplitude, beam3_rssi_amplitude, beam4_rssi_amplitude,
          bt_gain, beam1_bt_range_msb, beam2_bt_range_msb, beam3_bt_range_msb,
          beam4_bt_range_msb) = \
-            unpack('<HHHBBBBHLHHHHhhhhBBBBBBBBBBBBHHHhhhhBBBBBBBBBBBBHBBBBBBBBB', chunk)
+            _BT_STRUCT.unpack_from(chunk)
 
         if 1536 != bottom_track_id:
             raise SampleException("bottom_track_id was not equal to 1536")
 
-        self._dvl[Names.BOTTOM_TRACK_ID].append(bottom_track_id)
-        self._dvl[Names.BT_PINGS_PER_ENSEMBLE].append(bt_pings_per_ensemble)
-        self._dvl[Names.BT_DELAY_BEFORE_REACQUIRE].append(bt_delay_before_reacquire)
-        self._dvl[Names.BT_CORR_MAGNITUDE_MIN].append(bt_corr_magnitude_min)
-        self._dvl[Names.BT_EVAL_MAGNITUDE_MIN].append(bt_eval_magnitude_min)
-        self._dvl[Names.BT_PERCENT_GOOD_MIN].append(bt_percent_good_min)
-        self._dvl[Names.BT_MODE].append(bt_mode)
-        self._dvl[Names.BT_ERROR_VELOCITY_MAX].append(bt_error_velocity_max)
-        self._dvl[Names.BEAM1_BT_RANGE_LSB].append(beam1_bt_range_lsb)
-        self._dvl[Names.BEAM2_BT_RANGE_LSB].append(beam2_bt_range_lsb)
-        self._dvl[Names.BEAM3_BT_RANGE_LSB].append(beam3_bt_range_lsb)
-        self._dvl[Names.BEAM4_BT_RANGE_LSB].append(beam4_bt_range_lsb)
-        self._dvl[Names.EASTWARD_BT_VELOCITY].append(eastward_bt_velocity)
-        self._dvl[Names.NORTHWARD_BT_VELOCITY].append(northward_bt_velocity)
-        self._dvl[Names.UPWARD_BT_VELOCITY].append(upward_bt_velocity)
-        self._dvl[Names.ERROR_BT_VELOCITY].append(error_bt_velocity)
-        self._dvl[Names.BEAM1_BT_CORRELATION].append(beam1_bt_correlation)
-        self._dvl[Names.BEAM2_BT_CORRELATION].append(beam2_bt_correlation)
-        self._dvl[Names.BEAM3_BT_CORRELATION].append(beam3_bt_correlation)
-        self._dvl[Names.BEAM4_BT_CORRELATION].append(beam4_bt_correlation)
-        self._dvl[Names.BEAM1_EVAL_AMP].append(beam1_eval_amp)
-        self._dvl[Names.BEAM2_EVAL_AMP].append(beam2_eval_amp)
-        self._dvl[Names.BEAM3_EVAL_AMP].append(beam3_eval_amp)
-        self._dvl[Names.BEAM4_EVAL_AMP].append(beam4_eval_amp)
-        self._dvl[Names.BEAM1_BT_PERCENT_GOOD].append(beam1_bt_percent_good)
-        self._dvl[Names.BEAM2_BT_PERCENT_GOOD].append(beam2_bt_percent_good)
-        self._dvl[Names.BEAM3_BT_PERCENT_GOOD].append(beam3_bt_percent_good)
-        self._dvl[Names.BEAM4_BT_PERCENT_GOOD].append(beam4_bt_percent_good)
-        self._dvl[Names.REF_LAYER_MIN].append(ref_layer_min)
-        self._dvl[Names.REF_LAYER_NEAR].append(ref_layer_near)
-        self._dvl[Names.REF_LAYER_FAR].append(ref_layer_far)
-        self._dvl[Names.BEAM1_REF_LAYER_VELOCITY].append(beam1_ref_layer_velocity)
-        self._dvl[Names.BEAM2_REF_LAYER_VELOCITY].append(beam2_ref_layer_velocity)
-        self._dvl[Names.BEAM3_REF_LAYER_VELOCITY].append(beam3_ref_layer_velocity)
-        self._dvl[Names.BEAM4_REF_LAYER_VELOCITY].append(beam4_ref_layer_velocity)
-        self._dvl[Names.BEAM1_REF_CORRELATION].append(beam1_ref_correlation)
-        self._dvl[Names.BEAM2_REF_CORRELATION].append(beam2_ref_correlation)
-        self._dvl[Names.BEAM3_REF_CORRELATION].append(beam3_ref_correlation)
-        self._dvl[Names.BEAM4_REF_CORRELATION].append(beam4_ref_correlation)
-        self._dvl[Names.BEAM1_REF_INTENSITY].append(beam1_ref_intensity)
-        self._dvl[Names.BEAM2_REF_INTENSITY].append(beam2_ref_intensity)
-        self._dvl[Names.BEAM3_REF_INTENSITY].append(beam3_ref_intensity)
-        self._dvl[Names.BEAM4_REF_INTENSITY].append(beam4_ref_intensity)
-        self._dvl[Names.BEAM1_REF_PERCENT_GOOD].append(beam1_ref_percent_good)
-        self._dvl[Names.BEAM2_REF_PERCENT_GOOD].append(beam2_ref_percent_good)
-        self._dvl[Names.BEAM3_REF_PERCENT_GOOD].append(beam3_ref_percent_good)
-        self._dvl[Names.BEAM4_REF_PERCENT_GOOD].append(beam4_ref_percent_good)
-        self._dvl[Names.BT_MAX_DEPTH].append(bt_max_depth)
-        self._dvl[Names.BEAM1_RSSI_AMPLITUDE].append(beam1_rssi_amplitude)
-        self._dvl[Names.BEAM2_RSSI_AMPLITUDE].append(beam2_rssi_amplitude)
-        self._dvl[Names.BEAM3_RSSI_AMPLITUDE].append(beam3_rssi_amplitude)
-        self._dvl[Names.BEAM4_RSSI_AMPLITUDE].append(beam4_rssi_amplitude)
-        self._dvl[Names.BT_GAIN].append(bt_gain)
-        self._dvl[Names.BEAM1_BT_RANGE_MSB].append(beam1_bt_range_msb)
-        self._dvl[Names.BEAM2_BT_RANGE_MSB].append(beam2_bt_range_msb)
-        self._dvl[Names.BEAM3_BT_RANGE_MSB].append(beam3_bt_range_msb)
-        self._dvl[Names.BEAM4_BT_RANGE_MSB].append(beam4_bt_range_msb)
-
-    def fill_bt_nans(self):
+        self._dvl[Names.BOTTOM_TRACK_ID][k] = bottom_track_id
+        self._dvl[Names.BT_PINGS_PER_ENSEMBLE][k] = bt_pings_per_ensemble
+        self._dvl[Names.BT_DELAY_BEFORE_REACQUIRE][k] = bt_delay_before_reacquire
+        self._dvl[Names.BT_CORR_MAGNITUDE_MIN][k] = bt_corr_magnitude_min
+        self._dvl[Names.BT_EVAL_MAGNITUDE_MIN][k] = bt_eval_magnitude_min
+        self._dvl[Names.BT_PERCENT_GOOD_MIN][k] = bt_percent_good_min
+        self._dvl[Names.BT_MODE][k] = bt_mode
+        self._dvl[Names.BT_ERROR_VELOCITY_MAX][k] = bt_error_velocity_max
+        self._dvl[Names.BEAM1_BT_RANGE_LSB][k] = beam1_bt_range_lsb
+        self._dvl[Names.BEAM2_BT_RANGE_LSB][k] = beam2_bt_range_lsb
+        self._dvl[Names.BEAM3_BT_RANGE_LSB][k] = beam3_bt_range_lsb
+        self._dvl[Names.BEAM4_BT_RANGE_LSB][k] = beam4_bt_range_lsb
+        self._dvl[Names.EASTWARD_BT_VELOCITY][k] = eastward_bt_velocity
+        self._dvl[Names.NORTHWARD_BT_VELOCITY][k] = northward_bt_velocity
+        self._dvl[Names.UPWARD_BT_VELOCITY][k] = upward_bt_velocity
+        self._dvl[Names.ERROR_BT_VELOCITY][k] = error_bt_velocity
+        self._dvl[Names.BEAM1_BT_CORRELATION][k] = beam1_bt_correlation
+        self._dvl[Names.BEAM2_BT_CORRELATION][k] = beam2_bt_correlation
+        self._dvl[Names.BEAM3_BT_CORRELATION][k] = beam3_bt_correlation
+        self._dvl[Names.BEAM4_BT_CORRELATION][k] = beam4_bt_correlation
+        self._dvl[Names.BEAM1_EVAL_AMP][k] = beam1_eval_amp
+        self._dvl[Names.BEAM2_EVAL_AMP][k] = beam2_eval_amp
+        self._dvl[Names.BEAM3_EVAL_AMP][k] = beam3_eval_amp
+        self._dvl[Names.BEAM4_EVAL_AMP][k] = beam4_eval_amp
+        self._dvl[Names.BEAM1_BT_PERCENT_GOOD][k] = beam1_bt_percent_good
+        self._dvl[Names.BEAM2_BT_PERCENT_GOOD][k] = beam2_bt_percent_good
+        self._dvl[Names.BEAM3_BT_PERCENT_GOOD][k] = beam3_bt_percent_good
+        self._dvl[Names.BEAM4_BT_PERCENT_GOOD][k] = beam4_bt_percent_good
+        self._dvl[Names.REF_LAYER_MIN][k] = ref_layer_min
+        self._dvl[Names.REF_LAYER_NEAR][k] = ref_layer_near
+        self._dvl[Names.REF_LAYER_FAR][k] = ref_layer_far
+        self._dvl[Names.BEAM1_REF_LAYER_VELOCITY][k] = beam1_ref_layer_velocity
+        self._dvl[Names.BEAM2_REF_LAYER_VELOCITY][k] = beam2_ref_layer_velocity
+        self._dvl[Names.BEAM3_REF_LAYER_VELOCITY][k] = beam3_ref_layer_velocity
+        self._dvl[Names.BEAM4_REF_LAYER_VELOCITY][k] = beam4_ref_layer_velocity
+        self._dvl[Names.BEAM1_REF_CORRELATION][k] = beam1_ref_correlation
+        self._dvl[Names.BEAM2_REF_CORRELATION][k] = beam2_ref_correlation
+        self._dvl[Names.BEAM3_REF_CORRELATION][k] = beam3_ref_correlation
+        self._dvl[Names.BEAM4_REF_CORRELATION][k] = beam4_ref_correlation
+        self._dvl[Names.BEAM1_REF_INTENSITY][k] = beam1_ref_intensity
+        self._dvl[Names.BEAM2_REF_INTENSITY][k] = beam2_ref_intensity
+        self._dvl[Names.BEAM3_REF_INTENSITY][k] = beam3_ref_intensity
+        self._dvl[Names.BEAM4_REF_INTENSITY][k] = beam4_ref_intensity
+        self._dvl[Names.BEAM1_REF_PERCENT_GOOD][k] = beam1_ref_percent_good
+        self._dvl[Names.BEAM2_REF_PERCENT_GOOD][k] = beam2_ref_percent_good
+        self._dvl[Names.BEAM3_REF_PERCENT_GOOD][k] = beam3_ref_percent_good
+        self._dvl[Names.BEAM4_REF_PERCENT_GOOD][k] = beam4_ref_percent_good
+        self._dvl[Names.BT_MAX_DEPTH][k] = bt_max_depth
+        self._dvl[Names.BEAM1_RSSI_AMPLITUDE][k] = beam1_rssi_amplitude
+        self._dvl[Names.BEAM2_RSSI_AMPLITUDE][k] = beam2_rssi_amplitude
+        self._dvl[Names.BEAM3_RSSI_AMPLITUDE][k] = beam3_rssi_amplitude
+        self._dvl[Names.BEAM4_RSSI_AMPLITUDE][k] = beam4_rssi_amplitude
+        self._dvl[Names.BT_GAIN][k] = bt_gain
+        self._dvl[Names.BEAM1_BT_RANGE_MSB][k] = beam1_bt_range_msb
+        self._dvl[Names.BEAM2_BT_RANGE_MSB][k] = beam2_bt_range_msb
+        self._dvl[Names.BEAM3_BT_RANGE_MSB][k] = beam3_bt_range_msb
+        self._dvl[Names.BEAM4_BT_RANGE_MSB][k] = beam4_bt_range_msb
+
+    def fill_bt_nans(self, k):
         """
         If there is no bottom track for this ensemble, fill the bottom track
         portion with nans
         """
-        self._dvl[Names.BOTTOM_TRACK_ID].append(np.nan)
-        self._dvl[Names.BT_PINGS_PER_ENSEMBLE].append(np.nan)
-        self._dvl[Names.BT_DELAY_BEFORE_REACQUIRE].append(np.nan)
-        self._dvl[Names.BT_CORR_MAGNITUDE_MIN].append(np.nan)
-        self._dvl[Names.BT_EVAL_MAGNITUDE_MIN].append(np.nan)
-        self._dvl[Names.BT_PERCENT_GOOD_MIN].append(np.nan)
-        self._dvl[Names.BT_MODE].append(np.nan)
-        self._dvl[Names.BT_ERROR_VELOCITY_MAX].append(np.nan)
-        self._dvl[Names.BEAM1_BT_RANGE_LSB].append(np.nan)
-        self._dvl[Names.BEAM2_BT_RANGE_LSB].append(np.nan)
-        self._dvl[Names.BEAM3_BT_RANGE_LSB].append(np.nan)
-        self._dvl[Names.BEAM4_BT_RANGE_LSB].append(np.nan)
-        self._dvl[Names.EASTWARD_BT_VELOCITY].append(np.nan)
-        self._dvl[Names.NORTHWARD_BT_VELOCITY].append(np.nan)
-        self._dvl[Names.UPWARD_BT_VELOCITY].append(np.nan)
-        self._dvl[Names.ERROR_BT_VELOCITY].append(np.nan)
-        self._dvl[Names.BEAM1_BT_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM2_BT_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM3_BT_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM4_BT_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM1_EVAL_AMP].append(np.nan)
-        self._dvl[Names.BEAM2_EVAL_AMP].append(np.nan)
-        self._dvl[Names.BEAM3_EVAL_AMP].append(np.nan)
-        self._dvl[Names.BEAM4_EVAL_AMP].append(np.nan)
-        self._dvl[Names.BEAM1_BT_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM2_BT_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM3_BT_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM4_BT_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.REF_LAYER_MIN].append(np.nan)
-        self._dvl[Names.REF_LAYER_NEAR].append(np.nan)
-        self._dvl[Names.REF_LAYER_FAR].append(np.nan)
-        self._dvl[Names.BEAM1_REF_LAYER_VELOCITY].append(np.nan)
-        self._dvl[Names.BEAM2_REF_LAYER_VELOCITY].append(np.nan)
-        self._dvl[Names.BEAM3_REF_LAYER_VELOCITY].append(np.nan)
-        self._dvl[Names.BEAM4_REF_LAYER_VELOCITY].append(np.nan)
-        self._dvl[Names.BEAM1_REF_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM2_REF_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM3_REF_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM4_REF_CORRELATION].append(np.nan)
-        self._dvl[Names.BEAM1_REF_INTENSITY].append(np.nan)
-        self._dvl[Names.BEAM2_REF_INTENSITY].append(np.nan)
-        self._dvl[Names.BEAM3_REF_INTENSITY].append(np.nan)
-        self._dvl[Names.BEAM4_REF_INTENSITY].append(np.nan)
-        self._dvl[Names.BEAM1_REF_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM2_REF_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM3_REF_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BEAM4_REF_PERCENT_GOOD].append(np.nan)
-        self._dvl[Names.BT_MAX_DEPTH].append(np.nan)
-        self._dvl[Names.BEAM1_RSSI_AMPLITUDE].append(np.nan)
-        self._dvl[Names.BEAM2_RSSI_AMPLITUDE].append(np.nan)
-        self._dvl[Names.BEAM3_RSSI_AMPLITUDE].append(np.nan)
-        self._dvl[Names.BEAM4_RSSI_AMPLITUDE].append(np.nan)
-        self._dvl[Names.BT_GAIN].append(np.nan)
-        self._dvl[Names.BEAM1_BT_RANGE_MSB].append(np.nan)
-        self._dvl[Names.BEAM2_BT_RANGE_MSB].append(np.nan)
-        self._dvl[Names.BEAM3_BT_RANGE_MSB].append(np.nan)
-        self._dvl[Names.BEAM4_BT_RANGE_MSB].append(np.nan)
\ No newline at end of file
+        self._dvl[Names.BOTTOM_TRACK_ID][k] = np.nan
+        self._dvl[Names.BT_PINGS_PER_ENSEMBLE][k] = np.nan
+        self._dvl[Names.BT_DELAY_BEFORE_REACQUIRE][k] = np.nan
+        self._dvl[Names.BT_CORR_MAGNITUDE_MIN][k] = np.nan
+        self._dvl[Names.BT_EVAL_MAGNITUDE_MIN][k] = np.nan
+        self._dvl[Names.BT_PERCENT_GOOD_MIN][k] = np.nan
+        self._dvl[Names.BT_MODE][k] = np.nan
+        self._dvl[Names.BT_ERROR_VELOCITY_MAX][k] = np.nan
+        self._dvl[Names.BEAM1_BT_RANGE_LSB][k] = np.nan
+        self._dvl[Names.BEAM2_BT_RANGE_LSB][k] = np.nan
+        self._dvl[Names.BEAM3_BT_RANGE_LSB][k] = np.nan
+        self._dvl[Names.BEAM4_BT_RANGE_LSB][k] = np.nan
+        self._dvl[Names.EASTWARD_BT_VELOCITY][k] = np.nan
+        self._dvl[Names.NORTHWARD_BT_VELOCITY][k] = np.nan
+        self._dvl[Names.UPWARD_BT_VELOCITY][k] = np.nan
+        self._dvl[Names.ERROR_BT_VELOCITY][k] = np.nan
+        self._dvl[Names.BEAM1_BT_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM2_BT_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM3_BT_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM4_BT_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM1_EVAL_AMP][k] = np.nan
+        self._dvl[Names.BEAM2_EVAL_AMP][k] = np.nan
+        self._dvl[Names.BEAM3_EVAL_AMP][k] = np.nan
+        self._dvl[Names.BEAM4_EVAL_AMP][k] = np.nan
+        self._dvl[Names.BEAM1_BT_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM2_BT_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM3_BT_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM4_BT_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.REF_LAYER_MIN][k] = np.nan
+        self._dvl[Names.REF_LAYER_NEAR][k] = np.nan
+        self._dvl[Names.REF_LAYER_FAR][k] = np.nan
+        self._dvl[Names.BEAM1_REF_LAYER_VELOCITY][k] = np.nan
+        self._dvl[Names.BEAM2_REF_LAYER_VELOCITY][k] = np.nan
+        self._dvl[Names.BEAM3_REF_LAYER_VELOCITY][k] = np.nan
+        self._dvl[Names.BEAM4_REF_LAYER_VELOCITY][k] = np.nan
+        self._dvl[Names.BEAM1_REF_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM2_REF_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM3_REF_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM4_REF_CORRELATION][k] = np.nan
+        self._dvl[Names.BEAM1_REF_INTENSITY][k] = np.nan
+        self._dvl[Names.BEAM2_REF_INTENSITY][k] = np.nan
+        self._dvl[Names.BEAM3_REF_INTENSITY][k] = np.nan
+        self._dvl[Names.BEAM4_REF_INTENSITY][k] = np.nan
+        self._dvl[Names.BEAM1_REF_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM2_REF_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM3_REF_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BEAM4_REF_PERCENT_GOOD][k] = np.nan
+        self._dvl[Names.BT_MAX_DEPTH][k] = np.nan
+        self._dvl[Names.BEAM1_RSSI_AMPLITUDE][k] = np.nan
+        self._dvl[Names.BEAM2_RSSI_AMPLITUDE][k] = np.nan
+        self._dvl[Names.BEAM3_RSSI_AMPLITUDE][k] = np.nan
+        self._dvl[Names.BEAM4_RSSI_AMPLITUDE][k] = np.nan
+        self._dvl[Names.BT_GAIN][k] = np.nan
+        self._dvl[Names.BEAM1_BT_RANGE_MSB][k] = np.nan
+        self._dvl[Names.BEAM2_BT_RANGE_MSB][k] = np.nan
+        self._dvl[Names.BEAM3_BT_RANGE_MSB][k] = np.nan
+        self._dvl[Names.BEAM4_BT_RANGE_MSB][k] = np.nan
\ No newline at end of file
@@ -0,0 +1,57 @@
+from datetime import timedelta as td
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from glider_utils import analysis
+
+
+def _baseline_amphrs_used_per_day(pdts, amphrs):
+    """the original day by day loop"""
+    daterange = pd.date_range(pdts[0].date(), pdts[-1].date())
+    ahrspd = []
+    ahrspd_ts = []
+    for dayte in daterange:
+        day_ii = np.flatnonzero(pdts.date == dayte.date())
+        if len(day_ii) < 2:
+            continue
+        ahrs_used = amphrs[day_ii][-1] - amphrs[day_ii][0]
+        day_fraction = (
+            pdts[day_ii][-1] - pdts[day_ii][0]).total_seconds() / 86400
+        ahrspd.append(ahrs_used / day_fraction)
+        ahrspd_ts.append(dayte + td(hours=12))
+    if ahrspd_ts[-1] > pdts[-1]:
+        ahrspd_ts[-1] = pdts[-1]
+    return ahrspd_ts, np.array(ahrspd)
+
+
+def _amphrs(nan_rows=()):
+    rng = np.random.default_rng(1)
+    # irregular samples over ~6 days, with a gap day and a 1 sample day
+    seconds = np.sort(rng.uniform(0, 6*86400, 400))
+    seconds = seconds[(seconds < 2*86400) | (seconds > 3*86400)]
+    seconds = np.append(seconds, 7*86400 + 3600.)
+    pdts = pd.DatetimeIndex(
+        pd.Timestamp('2023-04-10 05:00') + pd.to_timedelta(seconds, 's'))
+    amphrs = np.cumsum(rng.uniform(0, 0.01, len(pdts)))
+    amphrs[list(nan_rows)] = np.nan
+    return pdts, amphrs
+
+
+@pytest.mark.parametrize('nan_rows', [(), (0,), (5, 17, -2), (-1,)])
+def test_amphrs_used_per_day_matches_baseline(nan_rows):
+    pdts, amphrs = _amphrs(nan_rows)
+    ts, ahrspd = analysis.amphrs_used_per_day(pdts, amphrs)
+    base_ts, base_ahrspd = _baseline_amphrs_used_per_day(pdts, amphrs)
+    assert list(ts) == list(base_ts)
+    np.testing.assert_allclose(ahrspd, base_ahrspd, equal_nan=True)
+
+
+def test_amphrs_used_per_day_nan_at_day_start():
+    pdts, amphrs = _amphrs()
+    first_of_day = np.flatnonzero(pdts.date == pdts[0].date())[0]
+    amphrs[first_of_day] = np.nan
+    _, ahrspd = analysis.amphrs_used_per_day(pdts, amphrs)
+    # the day's rate uses its actual first row, which is nan
+    assert np.isnan(ahrspd[0])
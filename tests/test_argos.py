@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from glider_utils import argos
+
+
+def _carry_around_add(a, b):
+    c = a + b
+    return (c & 0xff) + (c >> 16)
+
+
+def _baseline_checksum(msg):
+    """the original per hex digit checksum loop"""
+    s = 0
+    for i in msg:
+        s = _carry_around_add(s, int(i, 16))
+    return ~s + 1 & 0xff
+
+
+@pytest.mark.parametrize('length', [0, 1, 2, 7, 63, 64, 65, 120, 1000])
+def test_checksum_matches_baseline(length):
+    rng = random.Random(length)
+    for _ in range(200):
+        msg = ''.join(rng.choice('0123456789abcdefABCDEF')
+                      for _ in range(length))
+        assert argos.checksum(msg) == _baseline_checksum(msg)
+
+
+def test_checksum_all_ff():
+    msg = 'FF'*40
+    assert argos.checksum(msg) == _baseline_checksum(msg)
+
+
+@pytest.mark.parametrize('msg', ['0g', 'zz'*40, 'ab cd'*20])
+def test_checksum_rejects_non_hex(msg):
+    with pytest.raises(ValueError):
+        argos.checksum(msg)
+
+
+def _twos_comp(hexstr, nbits):
+    b = int(hexstr, 16)
+    if b >= 1<<nbits-1: b -= 1<<nbits
+    return b
+
+
+def _baseline_dev_decode(msg):
+    """the fields of the original hex slicing dev_decode"""
+    fields = {'time': int(msg[0:8], 16)}
+    for name, start, stop in (('val_lat', 8, 14), ('val_lon', 14, 20),
+                              ('inv_lat', 24, 30), ('inv_lon', 30, 36),
+                              ('tf_lat', 40, 46), ('tf_lon', 46, 52)):
+        fields[name] = _twos_comp(msg[start:stop], 4*6)
+    for name, start, stop in (('val_fix', 20, 24), ('inv_fix', 36, 40),
+                              ('tf_fix', 52, 56)):
+        fields[name] = int(msg[start:stop], 16)
+    fields['vx'] = _twos_comp(msg[56:58], 2*4)
+    fields['vy'] = _twos_comp(msg[58:60], 2*4)
+    return fields
+
+
+def test_dev_decode_matches_baseline(capsys):
+    rng = random.Random(3)
+    for _ in range(200):
+        msg = '%08x' % rng.randrange(2**31) + ''.join(
+            rng.choice('0123456789abcdefABCDEF') for _ in range(52))
+        fields = argos.dev_decode(msg)
+        expected = _baseline_dev_decode(msg)
+        timestamp = fields.pop('time')
+        assert timestamp == argos.dt.utcfromtimestamp(expected.pop('time'))
+        assert fields == expected
+        printed = capsys.readouterr().out.splitlines()
+        assert printed[0] == timestamp.isoformat()
+        assert printed[1] == 'Valid lat: {val_lat:d}, lon: {val_lon:d}, ' \
+            '{val_fix:d} min ago'.format(**expected)
+
+
+@pytest.mark.parametrize('msg', ['', '00'*29, '0'*59])
+def test_dev_decode_rejects_short_message(msg):
+    with pytest.raises(ValueError):
+        argos.dev_decode(msg)
@@ -0,0 +1,525 @@
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from glider_utils import general
+from glider_utils.parsers import dbd_parsers
+
+HEADER = """dbd_label: DBD_ASC(dinkum_binary_data_ascii)file
+encoding_ver: 2
+num_ascii_tags: 14
+all_sensors: 0
+filename: {name}
+the8x3_filename: 01230003
+filename_extension: dbd
+filename_label: {name}-dbd(01230003)
+mission_name: TEST.MI
+fileopen_time: {opentime}
+sensors_per_cycle: 1
+num_label_lines: 3
+num_segments: 1
+segment_filename_0: {name}
+m_present_time
+timestamp
+8
+"""
+
+
+def _fileopen_time(when):
+    # e.g. Tue_Mar__5_12:34:56_2024
+    return when.strftime('%a_%b_') + '{:_>2d}'.format(when.day) + \
+        when.strftime('_%H:%M:%S_%Y')
+
+
+def _write_files(tmp_path, names_times):
+    files = []
+    for name, when in names_times:
+        path = tmp_path / (name + '.dba')
+        opentime = _fileopen_time(when) if when else 'unknown'
+        path.write_text(HEADER.format(name=name, opentime=opentime))
+        files.append(str(path))
+    return files
+
+
+@pytest.fixture
+def segments(tmp_path):
+    start = datetime(2023, 4, 10, 3, 0, 0)
+    names_times = []
+    for seg in range(12):
+        when = start + timedelta(hours=5*seg)
+        names_times.append(
+            ('ce_386-2023-{:03d}-2-{:d}'.format(
+                when.timetuple().tm_yday, seg), when))
+    # out of order on purpose
+    return _write_files(tmp_path, names_times[::-1])
+
+
+def test_fileopen_datetime():
+    assert (dbd_parsers.fileopen_datetime('Tue_Mar__5_12:34:56_2024') ==
+            datetime(2024, 3, 5, 12, 34, 56))
+
+
+@pytest.mark.parametrize('hours', [0, 0.5, 4.99, 5, 17.3, 54.9, 56, 200])
+def test_find_file_for_time_matches_gliderfile_from_time(segments, hours):
+    target = datetime(2023, 4, 10, 3, 0, 0) + timedelta(hours=hours)
+    found = dbd_parsers.find_file_for_time(segments, target)
+    assert found == general.gliderfile_from_time(target, segments)
+
+
+def test_find_file_for_time_before_first_file(segments):
+    assert dbd_parsers.find_file_for_time(
+        segments, datetime(2023, 1, 1)) is None
+
+
+def test_find_file_for_time_by_header_when_names_are_short(tmp_path):
+    files = _write_files(tmp_path, [
+        ('01230003', datetime(2023, 4, 11)),
+        ('01230001', datetime(2023, 4, 10)),
+        ('01230002', datetime(2023, 4, 10, 12))])
+    found = dbd_parsers.find_file_for_time(files, datetime(2023, 4, 10, 13))
+    assert found == files[2]
+
+
+def test_find_file_for_time_names_file_without_fileopen_time(tmp_path):
+    files = _write_files(tmp_path, [
+        ('01230001', datetime(2023, 4, 10)), ('01230002', None)])
+    with pytest.raises(ValueError, match='01230002'):
+        dbd_parsers.find_file_for_time(files, datetime(2023, 4, 10, 13))
+
+
+@pytest.mark.parametrize('first, second', [
+    ('glider_utils.general', 'glider_utils.parsers.dbd_parsers'),
+    ('glider_utils.parsers.dbd_parsers', 'glider_utils.general'),
+])
+def test_no_import_cycle_with_general(first, second):
+    code = ('import sys, importlib; '
+            'importlib.import_module({!r}); '
+            'print("glider_utils.general" in sys.modules); '
+            'importlib.import_module({!r})').format(first, second)
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True)
+    # dbd_parsers doesn't need general, so importing it doesn't load it
+    assert out.stdout.strip() == str(first == 'glider_utils.general')
+
+
+DBA_FILE = os.path.join(os.path.dirname(__file__), 'data',
+                        'ce_386-2023-100-2-3.dba')
+
+
+def _baseline_parse_dba(filename):
+    """the hdr_dict, data_dict and data_keys of the original DbaDataParser"""
+    hdr_dict = {}
+    data_dict = {}
+    with open(filename) as fid:
+        num_hdr_lines = 14
+        hdr_line = 1
+        while hdr_line <= num_hdr_lines:
+            match = re.match(r'(.*): (.*)$', fid.readline())
+            if match:
+                key, value = match.group(1), match.group(2).strip()
+                if 'num_ascii_tags' in key:
+                    num_hdr_lines = int(value)
+                hdr_dict[key] = value
+            hdr_line += 1
+        column_labels = fid.readline().split()
+        column_type = fid.readline().split()
+        column_num_bytes = fid.readline().split()
+        data_array = np.array([line.split() for line in fid.readlines()],
+                              dtype=np.float64)
+    for ii in range(int(hdr_dict['sensors_per_cycle'])):
+        units = column_type[ii]
+        data_col = data_array[:, ii]
+        data_dict[column_labels[ii]] = {
+            'Name': column_labels[ii],
+            'Units': units,
+            'Number_of_Bytes': int(column_num_bytes[ii]),
+            'Data': data_col
+        }
+        if units == 'lat' or units == 'lon':
+            min_d100, deg = np.modf(data_col/100.)
+            data_dict[column_labels[ii]]['Data_deg'] = (
+                deg + (min_d100*100.)/60.)
+    return hdr_dict, data_dict, column_labels
+
+
+@pytest.fixture
+def dba_file(tmp_path):
+    """a copy of the fixture dba file, so caches are written to tmp_path"""
+    path = tmp_path / os.path.basename(DBA_FILE)
+    with open(DBA_FILE) as fid:
+        path.write_text(fid.read())
+    return str(path)
+
+
+def test_dba_parser_matches_baseline():
+    hdr_dict, data_dict, data_keys = _baseline_parse_dba(DBA_FILE)
+    parser = dbd_parsers.DbaDataParser(DBA_FILE)
+    assert parser.hdr_dict == hdr_dict
+    assert parser.data_keys == data_keys
+    assert list(parser.data_dict) == list(data_dict)
+    assert len(parser.data_dict) == int(hdr_dict['sensors_per_cycle']) == 9
+    for label, column in data_dict.items():
+        parsed = parser.data_dict[label]
+        for key in ('Name', 'Units', 'Number_of_Bytes'):
+            assert parsed[key] == column[key]
+            assert type(parsed[key]) is type(column[key])
+        assert parsed['Data'].dtype == np.float64
+        np.testing.assert_array_equal(parsed['Data'], column['Data'])
+    assert [column['Units'] for column in parser.data_dict.values()] == [
+        'timestamp', 'lat', 'lon', 'lat', 'lon', 'm', 'degc', 'volts',
+        'nodim']
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_dba_lat_lon_degrees_match_baseline(monkeypatch, compiled):
+    from glider_utils import geo
+    monkeypatch.setattr(geo, '_HAVE_NUMBA', compiled)
+    _, data_dict, _ = _baseline_parse_dba(DBA_FILE)
+    parser = dbd_parsers.DbaDataParser(DBA_FILE)
+    latlon = [label for label, column in data_dict.items()
+              if 'Data_deg' in column]
+    assert latlon == ['m_lat', 'm_lon', 'm_gps_lat', 'm_gps_lon']
+    for label in latlon:
+        deg = parser.data_dict[label]['Data_deg']
+        # the fixture has NaNs in every lat/lon column
+        assert np.isnan(deg).any()
+        np.testing.assert_array_equal(deg, data_dict[label]['Data_deg'])
+    assert [label for label, column in parser.data_dict.items()
+            if 'Data_deg' in column] == latlon
+
+
+def test_dba_downcast_by_units():
+    full = dbd_parsers.DbaDataParser(DBA_FILE)
+    parser = dbd_parsers.DbaDataParser(DBA_FILE, downcast=True)
+    dtypes = {label: column['Data'].dtype
+              for label, column in parser.data_dict.items()}
+    assert dtypes == {
+        'm_present_time': np.float64,
+        'm_lat': np.float64,
+        'm_lon': np.float64,
+        'm_gps_lat': np.float64,
+        'm_gps_lon': np.float64,
+        'm_depth': np.float32,
+        'sci_water_temp': np.float32,
+        'm_battery': np.float32,
+        'm_num_half_yos_in_segment': np.float64,
+    }
+    for label, column in parser.data_dict.items():
+        expected = full.data_dict[label]['Data'].astype(dtypes[label])
+        np.testing.assert_array_equal(column['Data'], expected)
+        if 'Data_deg' in column:
+            assert column['Data_deg'].dtype == np.float64
+        # indexing the parser still gives the float64 column
+        assert parser[label].Data.dtype == np.float64
+
+
+def _assert_same_data(parser, expected):
+    assert list(parser.data_dict) == list(expected.data_dict)
+    for label, column in expected.data_dict.items():
+        np.testing.assert_array_equal(
+            parser.data_dict[label]['Data'], column['Data'])
+
+
+def test_dba_cache_is_written_and_read_back(dba_file):
+    expected = dbd_parsers.DbaDataParser(DBA_FILE)
+    cache_file = dba_file + '.npy'
+    dbd_parsers.DbaDataParser(dba_file)
+    assert not os.path.exists(cache_file)
+
+    first = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    assert os.path.exists(cache_file)
+    assert not isinstance(first._data, np.memmap)
+    _assert_same_data(first, expected)
+
+    cached = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    assert isinstance(cached._data, np.memmap)
+    assert cached._data.mode == 'c'
+    assert cached._data.flags.f_contiguous
+    _assert_same_data(cached, expected)
+    np.testing.assert_array_equal(cached['m_lat'].Data,
+                                  expected['m_lat'].Data)
+
+    # changes to the copy-on-write data don't reach the cache
+    cached.data_dict['m_depth']['Data'][:] = -1.
+    again = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    _assert_same_data(again, expected)
+
+
+@pytest.mark.parametrize('shift_ns', [10**9, -10**9])
+def test_dba_cache_is_stale_when_the_file_changes(dba_file, shift_ns):
+    dbd_parsers.DbaDataParser(dba_file, cache=True)
+    with open(dba_file) as fid:
+        text = fid.read()
+    # rewrite the last row's depth and move the file's modification time,
+    # later or (e.g. restored from a backup) earlier than the cache
+    with open(dba_file, 'w') as fid:
+        fid.write(text.replace(' 20.5 ', ' 21.5 '))
+    mtime_ns = os.stat(dba_file + '.npy').st_mtime_ns + shift_ns
+    os.utime(dba_file, ns=(mtime_ns, mtime_ns))
+
+    parser = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    assert not isinstance(parser._data, np.memmap)
+    assert parser.data_dict['m_depth']['Data'][-1] == 21.5
+    # and the cache is rewritten for the changed file
+    cached = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    assert isinstance(cached._data, np.memmap)
+    assert cached.data_dict['m_depth']['Data'][-1] == 21.5
+
+
+def test_dba_unreadable_cache_is_parsed_again(dba_file):
+    cache_file = dba_file + '.npy'
+    with open(cache_file, 'wb') as fid:
+        fid.write(b'not an npy file')
+    mtime_ns = os.stat(dba_file).st_mtime_ns
+    os.utime(cache_file, ns=(mtime_ns, mtime_ns))
+    parser = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    _assert_same_data(parser, dbd_parsers.DbaDataParser(DBA_FILE))
+
+
+def test_dba_cache_with_downcast(dba_file):
+    full = dbd_parsers.DbaDataParser(DBA_FILE)
+    downcast = dbd_parsers.DbaDataParser(DBA_FILE, downcast=True)
+    # the cache always holds the float64 data, whichever parse wrote it
+    dbd_parsers.DbaDataParser(dba_file, cache=True, downcast=True)
+    cached = dbd_parsers.DbaDataParser(dba_file, cache=True)
+    assert isinstance(cached._data, np.memmap)
+    assert cached._data.dtype == np.float64
+    _assert_same_data(cached, full)
+
+    cached = dbd_parsers.DbaDataParser(dba_file, cache=True, downcast=True)
+    assert isinstance(cached._data, np.memmap)
+    for label, column in downcast.data_dict.items():
+        parsed = cached.data_dict[label]['Data']
+        assert parsed.dtype == column['Data'].dtype
+        np.testing.assert_array_equal(parsed, column['Data'])
+
+
+def test_dba_meta():
+    parser = dbd_parsers.DbaDataParser(DBA_FILE)
+    assert list(parser.meta.columns) == ['Name', 'Units', 'Number_of_Bytes']
+    assert list(parser.meta['Name']) == parser.data_keys
+    for row in parser.meta.itertuples(index=False):
+        column = parser.data_dict[row.Name]
+        assert row.Units == column['Units']
+        assert row.Number_of_Bytes == column['Number_of_Bytes']
+
+
+def test_dba_index_by_label():
+    parser = dbd_parsers.DbaDataParser(DBA_FILE)
+    for label, column in parser.data_dict.items():
+        indexed = parser[label]
+        assert isinstance(indexed, dbd_parsers.GliderColumn)
+        assert indexed.Name == label
+        assert indexed.Units == column['Units']
+        assert type(indexed.Units) is str
+        assert indexed.Number_of_Bytes == column['Number_of_Bytes']
+        assert type(indexed.Number_of_Bytes) is int
+        # a view of the parser's data, not a copy
+        assert np.shares_memory(indexed.Data, parser._data)
+        np.testing.assert_array_equal(indexed.Data, column['Data'])
+    assert parser['m_depth'][:3] == ('m_depth', 'm', 4)
+    with pytest.raises(KeyError):
+        parser['not_a_column']
+
+
+DATAVIZ_TEXT = """ce_386-2023-100-2-3.dba
+m_present_time m_lat m_lon m_depth
+timestamp lat lon m
+1681130096.1 4439.1234 -12415.4321 0.5
+1681130100.5 4439.13 -12415.44 2.25
+1681130104.25 NaN NaN 5.5
+1681130108 4439.1512 -12415.460812 10.125
+1681130112.75 4439.16 -12415.4711 NaN
+"""
+
+
+def _baseline_parse_dataviz(filename):
+    """the data_dict of the original DataVizDataParser"""
+    with open(filename) as fid:
+        fid.readline()
+        column_labels = fid.readline().split()
+        column_type = fid.readline().split()
+        data_array = np.array([line.split() for line in fid.readlines()])
+    return {
+        label: {'Name': label, 'Units': units, 'Data': data_array[:, ii]}
+        for ii, (label, units) in enumerate(zip(column_labels, column_type))}
+
+
+@pytest.mark.parametrize('block_rows', [1, 2, 10000])
+def test_dataviz_parser_matches_baseline(tmp_path, monkeypatch, block_rows):
+    monkeypatch.setattr(dbd_parsers, '_DATAVIZ_BLOCK_ROWS', block_rows)
+    path = tmp_path / 'dataviz.txt'
+    path.write_text(DATAVIZ_TEXT)
+    expected = _baseline_parse_dataviz(str(path))
+    parser = dbd_parsers.DataVizDataParser(str(path))
+    assert list(parser.data_dict) == list(expected)
+    assert parser.data_keys == list(expected)
+    for label, column in expected.items():
+        parsed = parser.data_dict[label]
+        assert parsed['Name'] == column['Name']
+        assert parsed['Units'] == column['Units']
+        # a string array per column, as wide as its own longest value
+        assert parsed['Data'].dtype == np.dtype(
+            'U{}'.format(max(map(len, column['Data']))))
+        np.testing.assert_array_equal(parsed['Data'], column['Data'])
+        assert parser[label][:3] == (label, column['Units'], None)
+        assert parser[label].Data is parsed['Data']
+
+
+@pytest.mark.parametrize('block_rows', [2, 10000])
+def test_dataviz_ragged_rows_raise(tmp_path, monkeypatch, block_rows):
+    monkeypatch.setattr(dbd_parsers, '_DATAVIZ_BLOCK_ROWS', block_rows)
+    path = tmp_path / 'dataviz.txt'
+    # the short row is in the last block of 2 rows
+    path.write_text(DATAVIZ_TEXT.replace(' NaN\n', '\n'))
+    with pytest.raises(ValueError, match='differing numbers of values'):
+        dbd_parsers.DataVizDataParser(str(path))
+
+
+def test_dataviz_no_rows(tmp_path):
+    path = tmp_path / 'dataviz.txt'
+    path.write_text(''.join(DATAVIZ_TEXT.splitlines(True)[:3]))
+    parser = dbd_parsers.DataVizDataParser(str(path))
+    assert list(parser.data_dict) == [
+        'm_present_time', 'm_lat', 'm_lon', 'm_depth']
+    assert all(column['Data'].size == 0
+               for column in parser.data_dict.values())
+
+
+def test_get_all_hdr_values_matches_parse_header():
+    header = dbd_parsers.parse_header(DBA_FILE)
+    del header['source_file'], header['file_size_bytes']
+    assert dbd_parsers.get_all_hdr_values(DBA_FILE) == header
+    assert len(header) == 14
+
+
+def test_get_header_fields_matches_hdr_value():
+    fields = ['fileopen_time', 'mission_name', 'filename',
+              'sensors_per_cycle', 'not_a_field']
+    values = dbd_parsers.get_header_fields(DBA_FILE, fields)
+    assert values == {
+        field: dbd_parsers.hdr_value(field, DBA_FILE)
+        for field in fields if field != 'not_a_field'}
+    assert values['filename'] == 'ce_386-2023-100-2-3'
+    # a missing field is left out, where hdr_value gives None
+    assert 'not_a_field' not in values
+    assert dbd_parsers.hdr_value('not_a_field', DBA_FILE) is None
+    assert dbd_parsers.get_header_fields(DBA_FILE, ['not_a_field']) == {}
+
+
+def _rewrite(path, old, new):
+    """replace text in a file and move its modification time on, as a
+    rewrite a second later would"""
+    with open(path) as fid:
+        text = fid.read()
+    mtime_ns = os.stat(path).st_mtime_ns + 10**9
+    with open(path, 'w') as fid:
+        fid.write(text.replace(old, new))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.parametrize('new_name', ['OTHER.MI', 'LONGER_NAME.MI'])
+def test_parse_header_rereads_a_rewritten_file(dba_file, new_name):
+    assert dbd_parsers.parse_header(dba_file)['mission_name'] == 'TEST.MI'
+    # the same size and a different size
+    _rewrite(dba_file, 'TEST.MI', new_name)
+    header = dbd_parsers.parse_header(dba_file)
+    assert header['mission_name'] == new_name
+    assert header['file_size_bytes'] == os.path.getsize(dba_file)
+
+
+def test_parse_header_result_does_not_change_the_cache(dba_file):
+    header = dbd_parsers.parse_header(dba_file)
+    expected = dict(header)
+    header['mission_name'] = 'CHANGED.MI'
+    del header['fileopen_time']
+    header['new'] = 1
+    assert dbd_parsers.parse_header(dba_file) == expected
+    assert dbd_parsers.parse_header(dba_file) is not (
+        dbd_parsers.parse_header(dba_file))
+
+
+def _long_header(num_tags):
+    """a header of num_tags lines of varying length, well over a block"""
+    lines = ['dbd_label: DBD_ASC(dinkum_binary_data_ascii)file',
+             'encoding_ver: 2',
+             'num_ascii_tags: {}'.format(num_tags)]
+    for ii in range(num_tags - len(lines)):
+        lines.append('tag_{}: {}'.format(ii, 'v' * (ii * 7 % 53)))
+    return '\n'.join(lines) + '\n'
+
+
+def _baseline_parse_header_lines(text, num_tags):
+    """the header fields as the original readline based parser read them"""
+    headers = {}
+    for line in text.splitlines(True)[:num_tags]:
+        tokens = line.split(': ')
+        headers[tokens[0].strip()] = tokens[1].strip()
+    return headers
+
+
+@pytest.mark.parametrize('block_size', [7, 1024])
+@pytest.mark.parametrize('binary', [False, True])
+def test_parse_header_longer_than_a_block(tmp_path, monkeypatch, block_size,
+                                          binary):
+    monkeypatch.setattr(dbd_parsers, '_HDR_BLOCK_SIZE', block_size)
+    num_tags = 80
+    header = _long_header(num_tags)
+    assert len(header) > 2 * 1024
+    # the line ends fall at many offsets into a block
+    ends = {offset % 1024 for offset in
+            np.cumsum([len(line) for line in header.splitlines(True)])}
+    assert len(ends) > 40
+    data = 'm_present_time\ntimestamp\n8\n1681130096.5\n'
+    if binary:
+        path = tmp_path / 'test.dbd'
+        path.write_bytes(header.encode() + bytes(range(256)) * 8)
+    else:
+        path = tmp_path / 'test.dba'
+        path.write_text(header + data)
+    parsed = dbd_parsers.parse_header(str(path))
+    del parsed['source_file'], parsed['file_size_bytes']
+    assert parsed == _baseline_parse_header_lines(header, num_tags)
+    assert len(parsed) == num_tags
+
+
+@pytest.mark.parametrize('block_size', [1, 5, 1024])
+def test_header_lines_across_blocks(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(dbd_parsers, '_HDR_BLOCK_SIZE', block_size)
+    text = _long_header(40) + 'no newline at the end'
+    path = tmp_path / 'test.dbd'
+    path.write_bytes(text.encode())
+    with open(path, 'rb') as fid:
+        assert list(dbd_parsers._header_lines(fid, True)) == text.split('\n')
+    with open(path) as fid:
+        assert list(dbd_parsers._header_lines(fid, False)) == (
+            text.split('\n'))
+
+
+def test_get_fileopen_times_keeps_order(segments):
+    files = segments[5:] + segments[:5]
+    times = dbd_parsers.get_fileopen_times(files, max_workers=4)
+    assert list(times) == files
+    assert list(times.values()) == [
+        dbd_parsers.get_fileopen_time(file) for file in files]
+    assert len(set(times.values())) == len(files)
+
+
+def test_get_fileopen_times_unreadable_file(segments, tmp_path, caplog):
+    missing = str(tmp_path / 'missing.dbd')
+    directory = str(tmp_path)
+    files = [segments[0], missing, segments[1], directory]
+    times = dbd_parsers.get_fileopen_times(files)
+    assert list(times) == files
+    assert times[missing] is None and times[directory] is None
+    assert times[segments[0]] == dbd_parsers.get_fileopen_time(segments[0])
+    assert times[segments[1]] == dbd_parsers.get_fileopen_time(segments[1])
+    assert 'missing.dbd' in caplog.text
+    # find_file_for_time names the file it couldn't get a time from
+    with pytest.raises(ValueError, match='missing.dbd'):
+        dbd_parsers.find_file_for_time(files[:3], datetime(2023, 4, 11))
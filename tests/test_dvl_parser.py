@@ -0,0 +1,241 @@
+import os
+import random
+import re
+import struct
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from glider_utils.parsers import dvl_parser
+from glider_utils.parsers.dvl_parser import DVLparser, Names, SampleException
+
+FIXED = '<HBBHBBBBHHHBBBBHBBBBhhBBHHBBBBHQHBBI'
+VARIABLE = '<HHBBBBBBBBBBHHHhhHhBBBBBBBBBBBBBBBBBBHIII'
+BOTTOM_TRACK = '<HHHBBBBHLHHHHhhhhBBBBBBBBBBBBHHHhhhhBBBBBBBBBBBBHBBBBBBBBBB'
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# a PD0 file of 12 ensembles written by `_write_pd0`, and its fields as
+# parsed into lists of values by the parser before the fields were numpy
+# arrays.  The per ensemble lists of the row and depth cell fields are
+# concatenated, with their lengths under '<name>_lengths'.
+PD0_FILE = os.path.join(DATA_DIR, 'explorer_dvl.pd0')
+PD0_LISTS_FILE = os.path.join(DATA_DIR, 'explorer_dvl_lists.npz')
+
+
+def _random_values(rng, fmt):
+    sizes = {'B': 8, 'H': 16, 'I': 32, 'L': 32, 'Q': 64}
+    values = []
+    for code in fmt[1:]:
+        if code == 'h':
+            values.append(rng.randrange(-32768, 32768))
+        else:
+            values.append(rng.randrange(2**sizes[code]))
+    return values
+
+
+def _chunks(rng, num_cells, bottom_track):
+    """the data types of a PD0 ensemble with random field values, and its
+    velocities"""
+    fixed = _random_values(rng, FIXED)
+    fixed[0] = 0  # fixed leader id
+    fixed[3] = rng.randrange(256) & 0b11111000 | rng.randrange(6)
+    fixed[4] = 0  # data flag
+    fixed[7] = num_cells
+    fixed[11] = 1  # signal processing mode
+    variable = _random_values(rng, VARIABLE)
+    variable[0] = 128  # variable leader id
+    variable[2:9] = [rng.randrange(40), rng.randrange(1, 13),
+                     rng.randrange(1, 29), rng.randrange(24),
+                     rng.randrange(60), rng.randrange(60), rng.randrange(100)]
+    velocity = [rng.randrange(-32768, 32768) for _ in range(4*num_cells)]
+    chunks = [struct.pack(FIXED, *fixed), struct.pack(VARIABLE, *variable),
+              struct.pack('<H%dh' % (4*num_cells), 256, *velocity)]
+    for data_id in (512, 768, 1024):
+        chunks.append(struct.pack(
+            '<H%dB' % (4*num_cells), data_id,
+            *(rng.randrange(256) for _ in range(4*num_cells))))
+    if bottom_track:
+        values = _random_values(rng, BOTTOM_TRACK)
+        values[0] = 1536  # bottom track id
+        chunks.append(struct.pack(BOTTOM_TRACK, *values))
+    return chunks, velocity
+
+
+def _assemble(chunks):
+    """a PD0 ensemble of data type chunks, with its header and checksum"""
+    offsets = [6 + 2*len(chunks)]
+    for chunk in chunks[:-1]:
+        offsets.append(offsets[-1] + len(chunk))
+    num_bytes = offsets[-1] + len(chunks[-1])
+    ensemble = struct.pack('<BBHBB', 0x7f, 0x7f, num_bytes, 0, len(chunks))
+    ensemble += struct.pack('<%dH' % len(chunks), *offsets) + b''.join(chunks)
+    return ensemble + struct.pack('<H', sum(ensemble) & 0xffff)
+
+
+def _ensemble(rng, num_cells, bottom_track):
+    """a PD0 ensemble with random field values, and its velocities"""
+    chunks, velocity = _chunks(rng, num_cells, bottom_track)
+    return _assemble(chunks), velocity
+
+
+def _write_pd0(path, n_ensembles, seed=0):
+    """write a PD0 file of ensembles with a varying number of depth cells,
+    some with bottom track data and some with junk between them"""
+    rng = random.Random(seed)
+    data = b'junk\x7f\x7f'
+    velocities = []
+    for _ in range(n_ensembles):
+        ensemble, velocity = _ensemble(rng, rng.randrange(5, 20),
+                                       rng.random() < 0.5)
+        data += ensemble + b'\x00\x7f' * rng.randrange(3)
+        velocities.append(velocity)
+    path.write_bytes(data)
+    return velocities
+
+
+def _parse(path, monkeypatch, compiled):
+    with monkeypatch.context() as m:
+        m.setattr(dvl_parser, '_HAVE_NUMBA', compiled)
+        return DVLparser(str(path)).return_data()
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_compiled_path_matches_python_path(tmp_path, monkeypatch, seed):
+    path = tmp_path / 'test.pd0'
+    velocities = _write_pd0(path, 40, seed)
+    compiled = _parse(path, monkeypatch, True)
+    python = _parse(path, monkeypatch, False)
+    _assert_same(compiled, python)
+
+    assert len(python[Names.NUM_CELLS]) == len(velocities)
+    for k, velocity in enumerate(velocities):
+        num_cells = python[Names.NUM_CELLS][k]
+        assert num_cells == len(velocity) // 4
+        assert list(python[Names.WATER_VELOCITY_EAST][k, :num_cells]) == (
+            velocity[::4])
+        assert np.all(python[Names.WATER_VELOCITY_EAST][k, num_cells:] ==
+                      -32768)
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_checksum_mismatch(tmp_path, monkeypatch, compiled):
+    path = tmp_path / 'test.pd0'
+    _write_pd0(path, 3)
+    data = bytearray(path.read_bytes())
+    # the first ensemble follows the junk, its checksum follows its bytes
+    start = len(b'junk\x7f\x7f')
+    data[start + struct.unpack_from('<H', data, start + 2)[0]] ^= 0xff
+    path.write_bytes(bytes(data))
+    with pytest.raises(SampleException, match='Checksum mismatch'):
+        _parse(path, monkeypatch, compiled)
+
+
+def _assert_same(compiled, python):
+    assert set(compiled.__dict__) == set(python.__dict__)
+    for name, value in python.__dict__.items():
+        assert compiled[name].dtype == value.dtype, name
+        np.testing.assert_array_equal(compiled[name], value, err_msg=name)
+
+
+def _truncated_file(path):
+    _write_pd0(path, 3)
+    path.write_bytes(path.read_bytes()[:-30])
+
+
+def _short_bottom_track(path):
+    # the bottom track is the last data type, and ends before its 81 bytes
+    chunks, _ = _chunks(random.Random(0), 5, True)
+    chunks[-1] = chunks[-1][:40]
+    path.write_bytes(_assemble(chunks))
+
+
+def _offset_past_end(path):
+    chunks, _ = _chunks(random.Random(0), 5, False)
+    ensemble = bytearray(_assemble(chunks))
+    length = struct.unpack_from('<H', ensemble, 2)[0]
+    struct.pack_into('<H', ensemble, 6 + 2*3, length - 1)
+    struct.pack_into('<H', ensemble, length,
+                     sum(ensemble[:length]) & 0xffff)
+    path.write_bytes(bytes(ensemble))
+
+
+def _no_fixed_leader(path):
+    # the fixed leader id of the data types is garbled, so neither path
+    # knows the number of depth cells
+    chunks, _ = _chunks(random.Random(0), 5, True)
+    chunks[0] = b'\x01' + chunks[0][1:]
+    path.write_bytes(_assemble(chunks))
+
+
+@pytest.mark.parametrize('write', [_truncated_file, _short_bottom_track,
+                                   _offset_past_end])
+def test_cut_short_ensembles(tmp_path, monkeypatch, write):
+    path = tmp_path / 'test.pd0'
+    write(path)
+    for compiled in (True, False):
+        with pytest.raises(SampleException, match='Ensemble is cut short'):
+            _parse(path, monkeypatch, compiled)
+
+
+def test_malformed_ensemble(tmp_path, monkeypatch):
+    path = tmp_path / 'test.pd0'
+    _no_fixed_leader(path)
+    python = _parse(path, monkeypatch, False)
+    _assert_same(_parse(path, monkeypatch, True), python)
+    assert python[Names.NUM_CELLS][0] == 0
+    assert python[Names.VELOCITY_DATA_ID][0] == 256
+    assert python[Names.WATER_VELOCITY_EAST].shape == (1, 0)
+
+
+def test_more_than_7_data_types(tmp_path, monkeypatch):
+    # the data types past the 7th, here the bottom track and an unknown
+    # one, are ignored.  The record marker only matches 6 or 7 data types,
+    # so it is widened for the test.
+    monkeypatch.setattr(dvl_parser, 'DVL_PD0_REGEX',
+                        re.compile(b'\x7f\x7f..\x00[\x06-\x09]', re.DOTALL))
+    rng = random.Random(0)
+    chunks, velocity = _chunks(rng, 5, False)
+    chunks.append(struct.pack('<H4B', 2048, 1, 2, 3, 4))
+    bt_chunks, _ = _chunks(rng, 5, True)
+    chunks += [bt_chunks[-1], struct.pack('<H4B', 2048, 1, 2, 3, 4)]
+    path = tmp_path / 'test.pd0'
+    path.write_bytes(_assemble(chunks))
+    python = _parse(path, monkeypatch, False)
+    _assert_same(_parse(path, monkeypatch, True), python)
+    assert python[Names.NUM_DATA_TYPES][0] == 9
+    assert python[Names.OFFSET_DATA_TYPES].shape == (1, 7)
+    assert np.isnan(python[Names.BOTTOM_TRACK_ID][0])
+    assert list(python[Names.WATER_VELOCITY_EAST][0]) == velocity[::4]
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_matches_list_parser(monkeypatch, compiled):
+    dvl = _parse(PD0_FILE, monkeypatch, compiled)
+    with np.load(PD0_LISTS_FILE) as npz:
+        lists = dict(npz)
+    n = len(lists[Names.CHECKSUM])
+    assert n == 12
+    assert np.isnan(lists[Names.BOTTOM_TRACK_ID]).any()
+    for name, value in dvl.__dict__.items():
+        assert len(value) == n, name
+        if name not in lists:
+            # never parsed, so left as the fill value
+            assert np.all(np.isnan(value)), name
+        elif name + '_lengths' not in lists:
+            np.testing.assert_array_equal(value, lists[name], err_msg=name)
+        else:
+            lengths = lists[name + '_lengths']
+            valid = np.arange(value.shape[1]) < lengths[:, np.newaxis]
+            np.testing.assert_array_equal(value[valid], lists[name],
+                                          err_msg=name)
+            fill = -32768 if value.dtype == np.int16 else 0
+            assert np.all(value[~valid] == fill), name
+
+
+def test_import_does_not_load_numba():
+    code = 'import sys, glider_utils.parsers; print("numba" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True)
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import glider_utils
+
+
+def _baseline_fwd_fill(x, init_nan_fill=None):
+    """the original np.unique based forward fill"""
+    y = x.copy()
+    nan_index = np.where(np.isnan(y))[0]
+    nan_cats = nan_index - range(len(nan_index))
+    uniques, firstidx, restoreidx = np.unique(nan_cats, True, True)
+    good_index = (nan_index[firstidx] - 1)[restoreidx]
+    if not init_nan_fill:
+        init_nan_fill = y[np.isfinite(y)][0]
+    if 0 in uniques:
+        y = np.append(y, init_nan_fill)
+    y[nan_index] = y[good_index]
+    if 0 in uniques:
+        y = np.delete(y, -1)
+    return y
+
+
+def _arrays():
+    rng = np.random.default_rng(2)
+    for n in (1, 2, 5, 100, 1000):
+        for nan_fraction in (0, 0.3, 0.9):
+            x = rng.normal(size=n)
+            x[rng.random(n) < nan_fraction] = np.nan
+            if np.isfinite(x).any():
+                yield x
+    yield np.array([np.nan, np.nan, 3., np.nan, 4., np.nan, np.nan])
+
+
+@pytest.fixture(params=['numba', 'numpy'])
+def fwd_fill(request, monkeypatch):
+    if request.param == 'numba':
+        pytest.importorskip('numba')
+    else:
+        monkeypatch.setattr(glider_utils, '_HAVE_NUMBA', False)
+    return glider_utils.fwd_fill
+
+
+@pytest.mark.parametrize('init_nan_fill', [None, 5., -2.5])
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_fwd_fill_matches_baseline(fwd_fill, init_nan_fill, dtype):
+    for x in _arrays():
+        x = x.astype(dtype)
+        y = fwd_fill(x, init_nan_fill)
+        assert y.dtype == x.dtype
+        np.testing.assert_array_equal(
+            y, _baseline_fwd_fill(x, init_nan_fill))
+
+
+def test_fwd_fill_does_not_modify_input(fwd_fill):
+    x = np.array([np.nan, 1., np.nan])
+    fwd_fill(x)
+    assert np.isnan(x[0]) and np.isnan(x[2])
+
+
+def test_fwd_fill_all_nan(fwd_fill):
+    x = np.full(4, np.nan)
+    assert np.isnan(fwd_fill(x)).all()
+    np.testing.assert_array_equal(fwd_fill(x, 1.), np.ones(4))
+
+
+def _baseline_fwd_fill_to_new_x(oldx, newx, y):
+    """the original np.unique based fwd_fill_to_new_x"""
+    temp_x = list(oldx)
+    temp_x.extend(list(newx))
+    all_x, unique_ii, inverse_ii = np.unique(
+        temp_x, return_index=True, return_inverse=True)
+    temp_y = np.full_like(temp_x, np.nan)
+    temp_y[0:len(oldx)] = y
+    all_y_ff = _baseline_fwd_fill(temp_y[unique_ii])
+    return all_y_ff[inverse_ii][len(oldx):]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_fwd_fill_to_new_x_matches_baseline(fwd_fill, seed, shuffle):
+    rng = np.random.default_rng(seed)
+    # whole second timestamps, so there are plenty of repeated old x values
+    # and new x values equal to old ones
+    oldx = np.sort(rng.integers(10, 60, 80)).astype(np.float64)
+    y = rng.normal(size=oldx.size)
+    y[rng.random(oldx.size) < 0.3] = np.nan
+    if shuffle:
+        order = rng.permutation(oldx.size)
+        oldx, y = oldx[order], y[order]
+    newx = np.concatenate(
+        [[0., 5.], rng.integers(10, 60, 40).astype(np.float64), [65.]])
+    result = glider_utils.fwd_fill_to_new_x(oldx, newx, y)
+    expected = _baseline_fwd_fill_to_new_x(oldx, newx, y)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_fwd_fill_to_new_x_uses_first_repeated_old_x(fwd_fill):
+    oldx = [1., 1., 2., 2., 3.]
+    y = [10., 11., np.nan, 12., np.nan]
+    result = glider_utils.fwd_fill_to_new_x(oldx, [1., 1.5, 2., 3.], y)
+    np.testing.assert_array_equal(result, [10., 10., 10., 10.])
@@ -0,0 +1,47 @@
+import warnings
+from datetime import datetime, timezone
+
+import pytest
+
+from glider_utils import general
+
+# (time string, the UTC unix time it represents)
+TIMES = [
+    ('2020-01-01T00:00:00', 1577836800.),
+    ('2020-01-01T00:00:00Z', 1577836800.),
+    ('2020-01-01T00:00:00.5Z', 1577836800.5),
+    ('2020-01-01T00:00:00+00:00', 1577836800.),
+    ('2020-01-01T05:00:00-05:00', 1577872800.),
+    ('2020-01-01T05:00:00-0500', 1577872800.),
+    ('2020-01-01T01:00:00+01', 1577836800.),
+    ('2020-01-01 05:00:00-05:00', 1577872800.),
+    ('2020-01-01 00:00:00+00:00', 1577836800.),
+    ('2020-01-01 00:00:00.5', 1577836800.5),
+    ('2020-01-01', 1577836800.),
+    ('Jan 1 2020 00:00:00', 1577836800.),
+]
+
+
+@pytest.mark.parametrize('timestr, expected', TIMES)
+def test_mts_and_ooimts(timestr, expected):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert general.mts(timestr) == expected
+        assert general.ooimts(timestr) == int(expected * 1000)
+
+
+def test_mts_matches_utc_datetime():
+    timestr = '2021-07-04T12:34:56-07:00'
+    expected = datetime(2021, 7, 4, 19, 34, 56, tzinfo=timezone.utc)
+    assert general.mts(timestr) == expected.timestamp()
+
+
+def test_mts_batch():
+    iso_times = [(t, e) for t, e in TIMES if t[:4] == '2020' and len(t) > 10]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        stamps = general.mts_batch([t for t, _ in iso_times])
+        no_offset = general.mts_batch(['2020-01-01T00:00:00Z',
+                                       '2020-01-01T00:00:01'])
+    assert list(stamps) == [e for _, e in iso_times]
+    assert list(no_offset) == [1577836800., 1577836801.]
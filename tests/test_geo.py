@@ -0,0 +1,144 @@
+import math
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from glider_utils import geo
+
+
+def _baseline_haversine(lat1, lon1, lat2, lon2):
+    """the original numpy haversine formula"""
+    phi1 = np.deg2rad(lat1)
+    phi2 = np.deg2rad(lat2)
+    del_phi = np.deg2rad(lat2-lat1)
+    del_lam = np.deg2rad(lon2-lon1)
+    a = (np.sin(del_phi/2.)**2. +
+         np.cos(phi1) * np.cos(phi2) * np.sin(del_lam/2.)**2.)
+    return 6371 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+
+# a pair of short and long distance positions off Oregon
+POSITIONS = [(44.6, -124.1, 44.601, -124.102), (44.6, -124.1, 46.2, -125.3)]
+FUNCS = [geo.haversine_dist, geo.haversine_dist_fast, geo.haversine_dist_auto]
+SCALAR_TYPES = [float, np.float64, np.float32, np.int64, np.array]
+
+
+@pytest.mark.parametrize('func', FUNCS)
+@pytest.mark.parametrize('scalar_type', SCALAR_TYPES)
+@pytest.mark.parametrize('pos', POSITIONS)
+def test_haversine_scalar_inputs(func, scalar_type, pos):
+    if scalar_type is np.int64:
+        pos = tuple(round(p) for p in pos)
+    args = [scalar_type(p) for p in pos]
+    d = func(*args)
+    assert np.ndim(d) == 0
+    expected = _baseline_haversine(*(float(arg) for arg in args))
+    # float32 inputs lose ~1 m of position and the cosine law ~1 m precision
+    assert d == pytest.approx(expected, abs=2e-3)
+
+
+@pytest.mark.parametrize('func', FUNCS)
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_haversine_arrays(func, dtype):
+    rng = np.random.default_rng(0)
+    lat1 = rng.uniform(-80, 80, 500)
+    lon1 = rng.uniform(-180, 180, 500)
+    lat2 = lat1 + rng.normal(0, 0.5, 500)
+    lon2 = lon1 + rng.normal(0, 0.5, 500)
+    lat2[:50] = lat1[:50] + 1e-4
+    lon2[:50] = lon1[:50]
+    args = [arr.astype(dtype) for arr in (lat1, lon1, lat2, lon2)]
+    d = func(*args)
+    assert d.shape == lat1.shape
+    expected = _baseline_haversine(*(arg.astype(np.float64) for arg in args))
+    np.testing.assert_allclose(d, expected, rtol=1e-6, atol=2e-3)
+
+
+def test_haversine_broadcast_point_against_array():
+    lat2 = np.linspace(40, 50, 11)
+    lon2 = np.linspace(-130, -120, 11)
+    for func in FUNCS:
+        d = func(44.6, -124.1, lat2, lon2)
+        np.testing.assert_allclose(
+            d, _baseline_haversine(44.6, -124.1, lat2, lon2),
+            rtol=1e-6, atol=2e-3)
+
+
+def test_import_does_not_load_numba():
+    code = 'import sys, glider_utils.geo; print("numba" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True)
+    assert out.stdout.strip() == 'False'
+
+
+def test_array_paths_match_scalar_paths():
+    lat2 = np.linspace(40, 50, 11)
+    lon2 = np.linspace(-130, -120, 11)
+    brng = geo.bearing(44.6, -124.1, lat2, lon2)
+    for i in range(lat2.size):
+        assert brng[i] == pytest.approx(
+            geo.bearing(44.6, -124.1, float(lat2[i]), float(lon2[i])),
+            abs=1e-9)
+    iso = np.array([4436.0, -12406.5, 0.0])
+    np.testing.assert_allclose(
+        geo.iso2deg(iso), [geo.iso2deg(float(pos)) for pos in iso])
+
+
+# positions with a NaN in each coordinate in turn, then a good position
+NAN_POSITIONS = [
+    np.array([np.nan, 44.6, 44.6, 44.6, 44.6]),
+    np.array([-124.1, np.nan, -124.1, -124.1, -124.1]),
+    np.array([46.2, 46.2, np.nan, 46.2, 46.2]),
+    np.array([-125.3, -125.3, -125.3, np.nan, -125.3]),
+]
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+@pytest.mark.parametrize('func', [geo.haversine_dist, geo.bearing])
+def test_nan_positions_give_nan(monkeypatch, compiled, func):
+    monkeypatch.setattr(geo, '_HAVE_NUMBA', compiled)
+    result = func(*NAN_POSITIONS)
+    assert np.isnan(result[:4]).all()
+    assert not np.isnan(result[4])
+
+
+@pytest.mark.parametrize('scalar_type', [float, np.float64])
+@pytest.mark.parametrize('func', [geo.haversine_dist, geo.bearing])
+def test_nan_scalar_positions_give_nan(scalar_type, func):
+    for k in range(5):
+        pos = [scalar_type(arr[k]) for arr in NAN_POSITIONS]
+        assert math.isnan(func(*pos)) == (k < 4)
+
+
+@pytest.mark.parametrize('scalar_type',
+                         [np.float64, np.float32, np.int64, np.array])
+def test_numpy_scalars_return_scalars(scalar_type):
+    pos = (44, -124, 46, -125)
+    args = [scalar_type(p) for p in pos]
+    expected = [geo.haversine_dist(*map(float, pos)),
+                geo.bearing(*map(float, pos)),
+                geo.dest_from_dist_and_bearing(*map(float, pos))]
+    results = [geo.haversine_dist(*args), geo.bearing(*args),
+               geo.dest_from_dist_and_bearing(*args)]
+    for result, value in zip(results, expected):
+        assert not isinstance(result, np.ndarray)
+        assert np.ndim(result) == 0 or all(
+            not isinstance(r, np.ndarray) for r in result)
+        assert result == pytest.approx(value, rel=1e-6)
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.dtype('float32'), 'float32',
+                                   np.float64, 'f8'])
+def test_haversine_pairwise_dtype(dtype):
+    lat1 = np.array([44.6, 45.0, 46.2])
+    lon1 = np.array([-124.1, -124.5, -125.3])
+    lat2 = np.array([44.7, 45.5])
+    lon2 = np.array([-124.2, -125.0])
+    d = geo.haversine_pairwise(lat1, lon1, lat2, lon2, dtype=dtype)
+    assert d.shape == (3, 2)
+    assert d.dtype == np.dtype(dtype)
+    expected = _baseline_haversine(lat1[:, None], lon1[:, None],
+                                   lat2[None, :], lon2[None, :])
+    np.testing.assert_allclose(d, expected, rtol=1e-5, atol=2e-3)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from glider_utils import _kernels
+
+numba = pytest.importorskip('numba')
+
+
+def _double(x):
+    return 2*x
+
+
+def test_threads_compile_once(monkeypatch):
+    monkeypatch.setattr(_double, '__module__', 'fake_kernels_module')
+    monkeypatch.setitem(_kernels._MARKED, 'fake_kernels_module', [])
+    _kernels.kernel()(_double)
+    namespace = {'__name__': 'fake_kernels_module', '_double': _double}
+
+    compiled = []
+    njit = numba.njit
+    def slow_njit(**options):
+        def wrap(func):
+            # widen the window in which other threads could see the swap
+            # half done
+            time.sleep(0.05)
+            compiled.append(func)
+            # the fake module can't be cached to disk
+            options.pop('cache')
+            return njit(**options)(func)
+        return wrap
+    seen = []
+    def first_call():
+        _kernels.compile_kernels(namespace)
+        seen.append((namespace['_prange'], namespace['_double']))
+
+    threads = [threading.Thread(target=first_call) for _ in range(8)]
+    with monkeypatch.context() as m:
+        m.setattr(numba, 'njit', slow_njit)
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert compiled == [_double]
+    assert all(value == seen[0] for value in seen)
+    assert seen[0][0] is numba.prange
+    assert seen[0][1](3) == 6